@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+LLM DriftGuard - Fast JSON Output for Search Commands
+Routes the Splunk SDK record writer's JSON encoding through orjson when installed
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; the SDK keeps its standard library encoder
+    orjson = None
+
+# Same encoder the SDK record writer uses by default
+_stdlib_iterencode = json.JSONEncoder(separators=(',', ':')).iterencode
+
+def _iterencode_json(value, _current_indent_level=0):
+    """Encode a value as compact JSON, using the standard library for types orjson rejects."""
+    try:
+        return (orjson.dumps(value).decode('utf-8'),)
+    except TypeError:
+        return _stdlib_iterencode(value, _current_indent_level)
+
+def dumps(value) -> str:
+    """Serialize a value to a JSON string, with orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(value)
+
+def install() -> bool:
+    """Patch the SDK record writer to encode JSON with orjson; returns False without orjson."""
+    if orjson is None:
+        return False
+    
+    from splunklib.searchcommands.internals import RecordWriter
+    RecordWriter._iterencode_json = staticmethod(_iterencode_json)
+    return True
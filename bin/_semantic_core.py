@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+LLM DriftGuard - Semantic Feature Kernel
+Single-pass text feature extraction used by the semantic analyzer
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, types
+    HAVE_NUMBA = True
+    # Code point arrays come from np.frombuffer over bytes and are read-only
+    _SIGNATURE = types.float64[::1](types.Array(types.uint32, 1, 'C', readonly=True),
+                                    types.int64, types.int64, types.int64[::1])
+except ImportError:
+    # Numba is optional. The kernel still runs uncompiled, but as a slow
+    # Python loop, so callers fall back to their NumPy feature code
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+    
+    _SIGNATURE = None
+
+# Words counted by the common-word features, as a padded code point table
+COMMON_WORDS = ('the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of')
+_COMMON_LENS = np.array([len(w) for w in COMMON_WORDS], dtype=np.int64)
+_COMMON_CODES = np.zeros((len(COMMON_WORDS), max(_COMMON_LENS)), dtype=np.uint32)
+for _i, _word in enumerate(COMMON_WORDS):
+    _COMMON_CODES[_i, :len(_word)] = [ord(c) for c in _word]
+
+# Number of features produced by text_features
+N_FEATURES = 50 + 3 + 3 + len(COMMON_WORDS) + 3 + 4
+
+# Compiled for this signature at import (and cached on disk) so the first
+# record of a search does not pay the JIT cost
+@njit(_SIGNATURE, cache=True)
+def text_features(codes, n_unique, n_upper, topic_counts):
+    """Feature vector of preprocessed text given as code points (words separated by single spaces).
+    
+    n_unique is the number of distinct words, n_upper the number of uppercase
+    characters and topic_counts the positive, negative, tech and business
+    keyword counts; these are computed by the caller.
+    """
+    n = codes.shape[0]
+    total = max(n, 1)
+    
+    letters = np.zeros(26, dtype=np.int64)
+    common = np.zeros(_COMMON_LENS.shape[0], dtype=np.int64)
+    word_lens = np.empty(n // 2 + 1, dtype=np.int64)
+    n_words = 0
+    n_dots = 0
+    n_questions = 0
+    n_exclamations = 0
+    
+    # One pass over the characters, closing a word at each space and at the end
+    start = -1
+    for i in range(n + 1):
+        c = codes[i] if i < n else 32
+        if c == 32:
+            if start >= 0:
+                length = i - start
+                word_lens[n_words] = length
+                n_words += 1
+                for k in range(_COMMON_LENS.shape[0]):
+                    if _COMMON_LENS[k] == length:
+                        matched = True
+                        for j in range(length):
+                            if codes[start + j] != _COMMON_CODES[k, j]:
+                                matched = False
+                                break
+                        if matched:
+                            common[k] += 1
+                start = -1
+        else:
+            if start < 0:
+                start = i
+            if 97 <= c <= 122:
+                letters[c - 97] += 1
+            elif c == 46:
+                n_dots += 1
+            elif c == 63:
+                n_questions += 1
+            elif c == 33:
+                n_exclamations += 1
+    
+    features = np.empty(N_FEATURES, dtype=np.float64)
+    
+    # Character features: 50 a-z frequencies (cycling), length, word density, uppercase ratio
+    for i in range(50):
+        features[i] = letters[i % 26] / total
+    features[50] = n / 1000.0
+    features[51] = n_words / total
+    features[52] = n_upper / total
+    
+    # Word features: length mean and standard deviation, diversity, common words
+    if n_words:
+        mean_len = word_lens[:n_words].sum() / n_words
+        deviations = word_lens[:n_words] - mean_len
+        features[53] = mean_len / 10.0
+        features[54] = np.sqrt((deviations * deviations).sum() / n_words) / 10.0
+        features[55] = n_unique / n_words
+    else:
+        features[53] = 0.0
+        features[54] = 0.0
+        features[55] = 0.0
+    word_total = max(n_words, 1)
+    for k in range(_COMMON_LENS.shape[0]):
+        features[56 + k] = common[k] / word_total
+    
+    # Semantic features: sentence density, question/exclamation rates, keyword counts
+    offset = 56 + _COMMON_LENS.shape[0]
+    features[offset] = (n_dots + 1) / total
+    features[offset + 1] = n_questions / total
+    features[offset + 2] = n_exclamations / total
+    for k in range(4):
+        features[offset + 3 + k] = topic_counts[k] / word_total
+    
+    return features
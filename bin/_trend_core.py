@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+LLM DriftGuard - Trend Regression Kernel
+Least-squares trend statistics used by the anomaly detector
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; the kernel is plain NumPy and runs uncompiled
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Compiled for this signature at import (and cached on disk) so the first
+# record of a search does not pay the JIT cost
+@njit('UniTuple(float64, 4)(float64[::1])', cache=True)
+def trend_stats(values):
+    """Fit a line to values (n >= 2) and return slope, intercept, prediction error and residual stdev."""
+    n = values.shape[0]
+    x = np.arange(n) * 1.0
+    
+    # Simple linear regression
+    sum_x = x.sum()
+    sum_y = values.sum()
+    sum_xy = (x * values).sum()
+    sum_x2 = (x * x).sum()
+    
+    denominator = n * sum_x2 - sum_x * sum_x
+    slope = (n * sum_xy - sum_x * sum_y) / denominator
+    intercept = (sum_y - slope * sum_x) / n
+    
+    # Error of the trend prediction for the latest value
+    prediction_error = abs(values[n - 1] - (slope * (n - 1) + intercept))
+    
+    # Sample standard deviation of the residuals
+    residuals = values - (slope * x + intercept)
+    residuals = residuals - residuals.mean()
+    residual_std = np.sqrt((residuals * residuals).sum() / (n - 1))
+    
+    return slope, intercept, prediction_error, residual_std
@@ -8,7 +8,7 @@ import sys
 import json
 import csv
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 from datetime import datetime
 import os
@@ -17,6 +17,103 @@ import os
 sys.path.insert(0, '/opt/splunk/lib/python3.9/site-packages')
 from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
 
+import _fast_json
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pac
+except ImportError:
+    # pyarrow is optional; lookups are parsed with the csv module instead
+    pa = None
+    pac = None
+
+# Threshold type codes used by the batch scoring kernel
+THRESHOLD_UPPER = 0
+THRESHOLD_LOWER = 1
+THRESHOLD_PERCENTAGE = 2
+THRESHOLD_TYPE_CODES = {'upper': THRESHOLD_UPPER, 'lower': THRESHOLD_LOWER}
+
+# Status codes returned by the batch scoring kernel
+STATUS_LABELS = ('normal', 'warning', 'critical')
+
+# Alert message layout; the prefix is looked up by status
+ALERT_PREFIXES = {'critical': 'CRITICAL - ', 'warning': 'WARNING - ', 'normal': ''}
+ALERT_MESSAGE_TEMPLATE = "{}Model {}: {} has {} by {:.1f}% (current: {:.3f}, baseline: {:.3f})"
+
+# Deviation magnitude categories, bucketed by absolute percentage change
+DEVIATION_BINS = np.array([5.0, 15.0, 30.0, 50.0])
+DEVIATION_CATEGORIES = np.array(['minimal', 'small', 'moderate', 'large', 'extreme'])
+
+# Parsed lookup files keyed by (path, parser), reused while the file is unchanged
+_CSV_CACHE = {}
+
+def _cached_csv(file_path: str, parser):
+    """Parse a CSV file, reusing the previous result while its mtime and size are unchanged."""
+    st = os.stat(file_path)
+    key = (file_path, parser)
+    signature = (st.st_mtime_ns, st.st_size)
+    
+    cached = _CSV_CACHE.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    parsed = parser(file_path)
+    _CSV_CACHE[key] = (signature, parsed)
+    return parsed
+
+def parse_float_column(values: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert a column of field values to float64, returning the values and a validity mask."""
+    # Common case: every value converts, so the whole column parses in one call
+    # (NumPy would silently turn missing values into NaN, so those take the slow path)
+    if None not in values:
+        try:
+            parsed = np.asarray(values, dtype=np.float64)
+            if parsed.ndim == 1:
+                return parsed, np.ones(len(parsed), dtype=bool)
+        except (ValueError, TypeError):
+            pass
+    
+    parsed = np.full(len(values), np.nan)
+    valid = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        try:
+            parsed[i] = float(value)
+            valid[i] = True
+        except (ValueError, TypeError):
+            pass
+    
+    return parsed, valid
+
+# Plain NumPy: every step is a whole-array expression, so compiling it
+# would save less per batch than importing numba costs per search
+def score_batch(cur, base, midx, warn, crit, ttype):
+    """Compare current values with baselines and determine status codes for a batch."""
+    zero_base = base == 0.0
+    zero_cur = cur == 0.0
+    safe_base = np.where(zero_base, 1.0, base)
+    
+    # Calculate deviations
+    deviation = cur - base
+    pct_change = np.where(zero_base, np.where(zero_cur, 0.0, np.inf), deviation / safe_base * 100.0)
+    ratio = np.where(zero_base, np.where(zero_cur, 1.0, np.inf), cur / safe_base)
+    
+    # Z-score assuming 10% standard deviation
+    z_score = np.where(zero_base, 0.0, deviation / (safe_base * 0.1))
+    
+    # Determine status: lower thresholds compare negated values so every
+    # threshold type reduces to "value above threshold is worse"
+    metric_type = ttype[midx]
+    lower = metric_type == THRESHOLD_LOWER
+    value = np.where(metric_type == THRESHOLD_UPPER, cur, np.where(lower, -cur, np.abs(pct_change)))
+    warning_value = np.where(lower, -warn[midx], warn[midx])
+    critical_value = np.where(lower, -crit[midx], crit[midx])
+    status = np.where(value > critical_value, 2, np.where(value > warning_value, 1, 0))
+    status = np.where(zero_base, np.where(zero_cur, 0, 2), status)
+    
+    return deviation, pct_change, ratio, z_score, status
+
 class BaselineComparator:
     """Handles baseline comparison and alert generation."""
     
@@ -24,27 +121,77 @@ class BaselineComparator:
         self.baselines = {}
         self.thresholds = {}
         self.logger = logging.getLogger(__name__)
+        self.build_threshold_arrays()
+    
+    def build_threshold_arrays(self):
+        """Pack thresholds into parallel arrays indexed by metric for the scoring kernel."""
+        # Index 0 holds the default percentage thresholds used for unknown metrics
+        self._metric_idx = {}
+        warn = [25.0]
+        crit = [50.0]
+        ttype = [THRESHOLD_PERCENTAGE]
+        
+        for i, (metric_name, threshold_config) in enumerate(self.thresholds.items(), start=1):
+            self._metric_idx[metric_name] = i
+            warn.append(threshold_config['warning_threshold'])
+            crit.append(threshold_config['critical_threshold'])
+            ttype.append(THRESHOLD_TYPE_CODES.get(threshold_config['threshold_type'], THRESHOLD_PERCENTAGE))
+        
+        self._warn = np.asarray(warn, dtype=np.float64)
+        self._crit = np.asarray(crit, dtype=np.float64)
+        self._type = np.asarray(ttype, dtype=np.int64)
+    
+    def compare_batch(self, current_values: List[float], baseline_values: List[float],
+                      metric_name: str) -> Tuple[np.ndarray, ...]:
+        """Compare a batch of current values with baselines for one metric."""
+        cur = np.asarray(current_values, dtype=np.float64)
+        base = np.asarray(baseline_values, dtype=np.float64)
+        midx = np.full(len(cur), self._metric_idx.get(metric_name, 0), dtype=np.int64)
+        return score_batch(cur, base, midx, self._warn, self._crit, self._type)
+    
+    def build_baseline_matrix(self, baselines: Dict[str, Dict[str, float]]):
+        """Stack every model's baselines into one (n_models + 1, n_metrics) matrix, NaN where missing."""
+        self._model_idx = {model_id: i for i, model_id in enumerate(baselines)}
+        metric_keys = list(dict.fromkeys(key for model_baselines in baselines.values() for key in model_baselines))
+        self._baseline_keys = {key: j for j, key in enumerate(metric_keys)}
         
+        # The extra last row is all NaN and serves unknown models when there is no 'default'
+        self._baseline_mat = np.full((len(baselines) + 1, len(metric_keys)), np.nan)
+        for i, model_baselines in enumerate(baselines.values()):
+            for key, value in model_baselines.items():
+                if isinstance(value, float):
+                    self._baseline_mat[i, self._baseline_keys[key]] = value
+        
+        self._default_row = self._model_idx.get('default', len(baselines))
+    
+    def baseline_row(self, model_id: str) -> int:
+        """Row of the baseline matrix for a model, falling back to the 'default' model."""
+        if not isinstance(model_id, str):
+            # Multivalue model fields cannot name a single model
+            return self._default_row
+        return self._model_idx.get(model_id, self._default_row)
+    
+    def lookup_baselines(self, rows: np.ndarray, metric_name: str) -> np.ndarray:
+        """Gather the baseline of a metric for each matrix row in one step (NaN where missing)."""
+        baseline_key = metric_name.replace('current_', '').replace('avg_', '')
+        missing = np.full(len(self._baseline_mat), np.nan)
+        
+        # Prefer the avg_ column and fall back to the bare metric name per model
+        avg_column = self._baseline_mat[:, self._baseline_keys[f'avg_{baseline_key}']] \
+            if f'avg_{baseline_key}' in self._baseline_keys else missing
+        column = self._baseline_mat[:, self._baseline_keys[baseline_key]] \
+            if baseline_key in self._baseline_keys else missing
+        column = np.where(np.isnan(avg_column), column, avg_column)
+        
+        return column[rows]
+    
     def load_baselines(self, baseline_file: str) -> Dict[str, Dict[str, float]]:
         """Load baseline metrics from CSV file."""
         baselines = {}
         try:
             app_path = '/opt/splunk/etc/apps/llm_driftguard/lookups/'
             file_path = os.path.join(app_path, baseline_file)
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    model_id = row.get('model_id', 'default')
-                    baselines[model_id] = {}
-                    
-                    # Load numeric baseline values
-                    for key, value in row.items():
-                        if key != 'model_id' and value:
-                            try:
-                                baselines[model_id][key] = float(value)
-                            except ValueError:
-                                baselines[model_id][key] = value
+            baselines = _cached_csv(file_path, self._parse_baselines)
                                 
         except FileNotFoundError:
             self.logger.warning(f"Baseline file {baseline_file} not found")
@@ -59,19 +206,7 @@ class BaselineComparator:
         try:
             app_path = '/opt/splunk/etc/apps/llm_driftguard/lookups/'
             file_path = os.path.join(app_path, threshold_file)
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    metric_name = row.get('metric_name')
-                    if metric_name:
-                        thresholds[metric_name] = {
-                            'threshold_type': row.get('threshold_type', 'upper'),
-                            'warning_threshold': float(row.get('warning_threshold', 0)),
-                            'critical_threshold': float(row.get('critical_threshold', 0)),
-                            'unit': row.get('unit', ''),
-                            'description': row.get('description', '')
-                        }
+            thresholds = _cached_csv(file_path, self._parse_thresholds)
                         
         except FileNotFoundError:
             self.logger.warning(f"Threshold file {threshold_file} not found")
@@ -80,6 +215,134 @@ class BaselineComparator:
             
         return thresholds
     
+    @staticmethod
+    def _parse_baselines(file_path: str) -> Dict[str, Dict[str, float]]:
+        """Parse baseline metrics CSV into per-model dictionaries."""
+        if pac is not None:
+            return BaselineComparator._parse_baselines_arrow(file_path)
+        
+        baselines = {}
+        with open(file_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                model_id = row.get('model_id', 'default')
+                baselines[model_id] = {}
+                
+                # Load numeric baseline values
+                for key, value in row.items():
+                    if key != 'model_id' and value:
+                        try:
+                            baselines[model_id][key] = float(value)
+                        except ValueError:
+                            baselines[model_id][key] = value
+        
+        return baselines
+    
+    @staticmethod
+    def _parse_thresholds(file_path: str) -> Dict[str, Dict[str, float]]:
+        """Parse alert thresholds CSV into per-metric dictionaries."""
+        if pac is not None:
+            return BaselineComparator._parse_thresholds_arrow(file_path)
+        
+        thresholds = {}
+        with open(file_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                metric_name = row.get('metric_name')
+                if metric_name:
+                    thresholds[metric_name] = {
+                        'threshold_type': row.get('threshold_type', 'upper'),
+                        'warning_threshold': float(row.get('warning_threshold', 0)),
+                        'critical_threshold': float(row.get('critical_threshold', 0)),
+                        'unit': row.get('unit', ''),
+                        'description': row.get('description', '')
+                    }
+        
+        return thresholds
+    
+    @staticmethod
+    def _parse_baselines_arrow(file_path: str) -> Dict[str, Dict[str, float]]:
+        """Parse baseline metrics CSV with pyarrow's typed CSV reader."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            header = next(csv.reader(f), [])
+        
+        # Read every column as text (empty cells as nulls) so dates and other
+        # non-numeric values are kept verbatim, then cast numeric columns in C++
+        table = pac.read_csv(file_path, convert_options=pac.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            strings_can_be_null=True
+        ))
+        
+        columns = {}
+        for name in table.column_names:
+            column = table.column(name)
+            if name == 'model_id':
+                columns[name] = [value or '' for value in column.to_pylist()]
+                continue
+            try:
+                columns[name] = column.cast(pa.float64()).to_pylist()
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                # Non-numeric column: convert cell by cell as the csv path does
+                columns[name] = [BaselineComparator._to_float(value) for value in column.to_pylist()]
+        
+        model_ids = columns.pop('model_id', ['default'] * table.num_rows)
+        baselines = {}
+        for i, model_id in enumerate(model_ids):
+            baselines[model_id] = {
+                key: values[i] for key, values in columns.items() if values[i] is not None
+            }
+        
+        return baselines
+    
+    @staticmethod
+    def _to_float(value: Optional[str]) -> Any:
+        """Convert a lookup cell to float, keeping non-numeric values as strings."""
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    
+    @staticmethod
+    def _parse_thresholds_arrow(file_path: str) -> Dict[str, Dict[str, float]]:
+        """Parse alert thresholds CSV with pyarrow's typed CSV reader."""
+        table = pac.read_csv(file_path, convert_options=pac.ConvertOptions(
+            column_types={
+                'metric_name': pa.string(),
+                'threshold_type': pa.string(),
+                'warning_threshold': pa.float64(),
+                'critical_threshold': pa.float64(),
+                'unit': pa.string(),
+                'description': pa.string()
+            }
+        ))
+        
+        def column(name, default):
+            if name not in table.column_names:
+                return [default] * table.num_rows
+            values = table.column(name)
+            if values.null_count:
+                raise ValueError(f"Missing values in column {name}")
+            return values.to_numpy(zero_copy_only=False).tolist()
+        
+        thresholds = {}
+        for metric_name, threshold_type, warning, critical, unit, description in zip(
+            column('metric_name', ''), column('threshold_type', 'upper'),
+            column('warning_threshold', 0.0), column('critical_threshold', 0.0),
+            column('unit', ''), column('description', '')
+        ):
+            if metric_name:
+                thresholds[metric_name] = {
+                    'threshold_type': threshold_type,
+                    'warning_threshold': warning,
+                    'critical_threshold': critical,
+                    'unit': unit,
+                    'description': description
+                }
+        
+        return thresholds
+    
     def compare_with_baseline(self, current_value: float, baseline_value: float, 
                             metric_name: str, comparison_type: str = 'percentage') -> Dict[str, Any]:
         """Compare current value with baseline and calculate deviation."""
@@ -187,18 +450,11 @@ class BaselineComparator:
         if status == 'normal':
             return f"Model {model_id}: {metric_name} is within normal range"
         
-        direction = "increased" if percentage_change > 0 else "decreased"
-        abs_change = abs(percentage_change)
-        
-        message = f"Model {model_id}: {metric_name} has {direction} by {abs_change:.1f}% "
-        message += f"(current: {current_value:.3f}, baseline: {baseline_value:.3f})"
-        
-        if status == 'critical':
-            message = f"CRITICAL - {message}"
-        elif status == 'warning':
-            message = f"WARNING - {message}"
-            
-        return message
+        return ALERT_MESSAGE_TEMPLATE.format(
+            ALERT_PREFIXES.get(status, ''), model_id, metric_name,
+            "increased" if percentage_change > 0 else "decreased", abs(percentage_change),
+            current_value, baseline_value
+        )
 
 @Configuration()
 class BaselineCompareCommand(StreamingCommand):
@@ -257,8 +513,11 @@ class BaselineCompareCommand(StreamingCommand):
         self.comparator = BaselineComparator()
         self.logger = logging.getLogger(__name__)
         
+    # Number of records scored together per batch
+    batch_size = 1024
+    
     def stream(self, records):
-        """Process each record and compare against baselines."""
+        """Process records in batches and compare against baselines."""
         
         # Load baselines and thresholds
         if self.baseline_file:
@@ -268,105 +527,127 @@ class BaselineCompareCommand(StreamingCommand):
             
         thresholds = self.comparator.load_thresholds(self.threshold_file)
         self.comparator.thresholds = thresholds
+        self.comparator.build_threshold_arrays()
+        self.comparator.build_baseline_matrix(baselines)
         
+        batch = []
         for record in records:
-            try:
-                # Get current metric value
-                current_value = record.get(self.metric)
-                if current_value is None:
-                    record['baseline_comparison_error'] = f'Missing metric field: {self.metric}'
-                    yield record
-                    continue
-                
-                try:
-                    current_value = float(current_value)
-                except (ValueError, TypeError):
-                    record['baseline_comparison_error'] = f'Invalid numeric value for {self.metric}: {current_value}'
-                    yield record
-                    continue
-                
-                # Get baseline value
-                baseline_value = None
-                model_id = record.get(self.model_field, 'default')
-                
-                if self.baseline_field and self.baseline_field in record:
-                    # Use baseline from record
-                    try:
-                        baseline_value = float(record[self.baseline_field])
-                    except (ValueError, TypeError):
-                        pass
-                
-                if baseline_value is None and baselines:
-                    # Use baseline from file
-                    model_baselines = baselines.get(model_id, baselines.get('default', {}))
-                    baseline_key = self.metric.replace('current_', '').replace('avg_', '')
-                    baseline_value = model_baselines.get(f'avg_{baseline_key}', model_baselines.get(baseline_key))
-                
-                if baseline_value is None:
-                    record['baseline_comparison_error'] = f'No baseline found for metric {self.metric}'
-                    yield record
-                    continue
-                
-                # Perform comparison
-                comparison_result = self.comparator.compare_with_baseline(
-                    current_value, baseline_value, self.metric, self.comparison
-                )
-                
-                # Add comparison results to record
-                record['baseline_comparison_status'] = comparison_result['status']
-                record['baseline_current_value'] = round(comparison_result['current_value'], 4)
-                record['baseline_reference_value'] = round(comparison_result['baseline_value'], 4)
-                record['baseline_absolute_deviation'] = round(comparison_result['absolute_deviation'], 4)
-                record['baseline_percentage_change'] = round(comparison_result['percentage_change'], 2)
-                record['baseline_ratio'] = round(comparison_result['ratio'], 4)
-                record['baseline_z_score'] = round(comparison_result['z_score'], 2)
-                
-                # Generate alert message if requested
-                if self.generate_alerts and comparison_result['status'] != 'normal':
-                    alert_message = self.comparator.generate_alert_message(comparison_result, model_id)
-                    record['baseline_alert_message'] = alert_message
-                    record['baseline_alert_severity'] = comparison_result['status']
-                    record['baseline_alert_time'] = datetime.now().isoformat()
-                
-                # Add threshold information if available
-                if self.metric in thresholds:
-                    threshold_info = thresholds[self.metric]
-                    record['baseline_warning_threshold'] = threshold_info['warning_threshold']
-                    record['baseline_critical_threshold'] = threshold_info['critical_threshold']
-                    record['baseline_threshold_type'] = threshold_info['threshold_type']
-                
-                # Categorize deviation magnitude
-                abs_pct_change = abs(comparison_result['percentage_change'])
-                if abs_pct_change < 5:
-                    deviation_category = 'minimal'
-                elif abs_pct_change < 15:
-                    deviation_category = 'small'
-                elif abs_pct_change < 30:
-                    deviation_category = 'moderate'
-                elif abs_pct_change < 50:
-                    deviation_category = 'large'
-                else:
-                    deviation_category = 'extreme'
-                
-                record['baseline_deviation_category'] = deviation_category
-                
-                # Add trend indication
-                if comparison_result['percentage_change'] > 5:
-                    record['baseline_trend'] = 'increasing'
-                elif comparison_result['percentage_change'] < -5:
-                    record['baseline_trend'] = 'decreasing'
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield from self._process_batch(batch, thresholds)
+                batch = []
+        
+        if batch:
+            yield from self._process_batch(batch, thresholds)
+    
+    def _process_batch(self, batch: List[Dict[str, Any]], thresholds: Dict[str, Dict[str, float]]):
+        """Validate and score a batch of records at once and add comparison fields."""
+        # Get current metric values and flag missing or non-numeric ones up front
+        raw_values = [record.get(self.metric) for record in batch]
+        current_array, valid = parse_float_column(raw_values)
+        
+        if not valid.all():
+            for i in np.flatnonzero(~valid).tolist():
+                if raw_values[i] is None:
+                    batch[i]['baseline_comparison_error'] = f'Missing metric field: {self.metric}'
                 else:
-                    record['baseline_trend'] = 'stable'
-                
-                # Add metadata
-                record['baseline_comparison_time'] = datetime.now().isoformat()
-                record['baseline_comparison_method'] = self.comparison
-                
-            except Exception as e:
-                self.logger.error(f"Error in baseline comparison: {str(e)}")
-                record['baseline_comparison_error'] = str(e)
+                    batch[i]['baseline_comparison_error'] = f'Invalid numeric value for {self.metric}: {raw_values[i]}'
+        
+        # Baselines from the record take precedence; the rest are gathered from the
+        # stacked baseline matrix in one step
+        model_ids = [record.get(self.model_field, 'default') for record in batch]
+        rows = np.fromiter((self.comparator.baseline_row(model_id) for model_id in model_ids),
+                           dtype=np.intp, count=len(batch))
+        baseline_array = self.comparator.lookup_baselines(rows, self.metric)
+        
+        if self.baseline_field:
+            record_baselines, has_record_baseline = parse_float_column(
+                [record.get(self.baseline_field) for record in batch]
+            )
+            baseline_array = np.where(has_record_baseline, record_baselines, baseline_array)
+        
+        found = valid & ~np.isnan(baseline_array)
+        for i in np.flatnonzero(valid & ~found).tolist():
+            batch[i]['baseline_comparison_error'] = f'No baseline found for metric {self.metric}'
+        
+        if found.any():
+            keep = np.flatnonzero(found)
+            indices = keep.tolist()
+            self._add_comparison_fields(
+                [batch[i] for i in indices], [model_ids[i] for i in indices],
+                current_array[keep], baseline_array[keep], thresholds
+            )
+        
+        yield from batch
+    
+    def _add_comparison_fields(self, records: List[Dict[str, Any]], model_ids: List[str],
+                               current_values: np.ndarray, baseline_values: np.ndarray,
+                               thresholds: Dict[str, Dict[str, float]]):
+        """Compare a batch against baselines and write the result columns back to the records."""
+        # Perform comparison for the whole batch
+        deviation, pct_change, ratio, z_score, status = self.comparator.compare_batch(
+            current_values, baseline_values, self.metric
+        )
+        
+        # Categorize deviation magnitude and trend for the whole batch
+        deviation_category = DEVIATION_CATEGORIES[np.digitize(np.abs(pct_change), DEVIATION_BINS)].tolist()
+        trend = np.where(pct_change > 5, 'increasing', np.where(pct_change < -5, 'decreasing', 'stable')).tolist()
+        
+        # Round every output column once; alert messages keep the unrounded values
+        current_rounded = np.round(current_values, 4).tolist()
+        baseline_rounded = np.round(baseline_values, 4).tolist()
+        pct_rounded = np.round(pct_change, 2).tolist()
+        deviation = np.round(deviation, 4, out=deviation).tolist()
+        ratio = np.round(ratio, 4, out=ratio).tolist()
+        z_score = np.round(z_score, 2, out=z_score).tolist()
+        status = [STATUS_LABELS[code] for code in status.tolist()]
+        
+        if self.generate_alerts:
+            current_values = current_values.tolist()
+            baseline_values = baseline_values.tolist()
+            pct_change = pct_change.tolist()
+        
+        # Threshold information is the same for every record
+        threshold_fields = {}
+        if self.metric in thresholds:
+            threshold_info = thresholds[self.metric]
+            threshold_fields = {
+                'baseline_warning_threshold': threshold_info['warning_threshold'],
+                'baseline_critical_threshold': threshold_info['critical_threshold'],
+                'baseline_threshold_type': threshold_info['threshold_type']
+            }
+        
+        # One timestamp per batch; sub-second precision is not needed here
+        batch_time = datetime.now().isoformat()
+        
+        for i, record in enumerate(records):
+            record['baseline_comparison_status'] = status[i]
+            record['baseline_current_value'] = current_rounded[i]
+            record['baseline_reference_value'] = baseline_rounded[i]
+            record['baseline_absolute_deviation'] = deviation[i]
+            record['baseline_percentage_change'] = pct_rounded[i]
+            record['baseline_ratio'] = ratio[i]
+            record['baseline_z_score'] = z_score[i]
+            
+            # Generate alert message if requested
+            if self.generate_alerts and status[i] != 'normal':
+                record['baseline_alert_message'] = ALERT_MESSAGE_TEMPLATE.format(
+                    ALERT_PREFIXES[status[i]], model_ids[i], self.metric,
+                    "increased" if pct_change[i] > 0 else "decreased", abs(pct_change[i]),
+                    current_values[i], baseline_values[i]
+                )
+                record['baseline_alert_severity'] = status[i]
+                record['baseline_alert_time'] = batch_time
+            
+            record.update(threshold_fields)
+            record['baseline_deviation_category'] = deviation_category[i]
+            record['baseline_trend'] = trend[i]
             
-            yield record
+            # Add metadata
+            record['baseline_comparison_time'] = batch_time
+            record['baseline_comparison_method'] = self.comparison
 
 if __name__ == '__main__':
+    # Serialize output records with orjson when it is installed
+    _fast_json.install()
     dispatch(BaselineCompareCommand, sys.argv, sys.stdin, sys.stdout, __name__)
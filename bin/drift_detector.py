@@ -12,42 +12,98 @@ from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
 import hashlib
+import math
 
 # Splunk SDK imports
 sys.path.insert(0, '/opt/splunk/lib/python3.9/site-packages')
 from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
 
+import _fast_json
+
+try:
+    from blake3 import blake3
+except ImportError:
+    # blake3 is optional and only used when hash_backend=blake3 is asked for
+    blake3 = None
+
+def _sha256_digest(data: bytes, length: int) -> bytes:
+    """Hash bytes to a SHA-256 digest of at most length bytes."""
+    return hashlib.sha256(data).digest()[:length]
+
+def _blake3_digest(data: bytes, length: int) -> bytes:
+    """Hash bytes to a digest of exactly length bytes (BLAKE3 is extendable-output)."""
+    return blake3(data).digest(length=length)
+
+# Embedding hash backends: digest function and maximum digest size (None if unbounded).
+# The backend determines the embedding values, so it must match the baselines'
+HASH_BACKENDS = {
+    'sha256': (_sha256_digest, hashlib.sha256().digest_size),
+    'blake3': (_blake3_digest, None),
+}
+
+# Scale of int8 embedding quantization; embeddings are L2-normalized so every
+# component lies in [-1, 1]
+QUANT_SCALE = 127.0
+
+def quantize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """Quantize L2-normalized embeddings to int8."""
+    return np.clip(np.round(embeddings * QUANT_SCALE), -128, 127).astype(np.int8)
+
 # Simple embedding simulation (in production, use sentence-transformers or similar)
 class SimpleEmbedder:
-    """Simple text embedding for demonstration. In production, use proper embeddings."""
+    """Simple text embedding for demonstration. In production, use proper embeddings.
+    
+    Each bit of the text's hash digest becomes one embedding component, so the
+    default 256 dimensions are exactly one SHA-256 digest. The hash backend
+    (SHA-256 unless BLAKE3 is asked for) determines the embedding values, so
+    stored baseline embeddings must come from the same backend.
+    """
     
-    def __init__(self, dim: int = 384):
+    def __init__(self, dim: int = 256, hash_backend: str = 'sha256'):
+        if hash_backend == 'blake3' and blake3 is None:
+            raise ValueError("hash_backend=blake3 requires the blake3 package")
+        
         self.dim = dim
+        self.hash_backend = hash_backend
+        self._digest, max_digest_size = HASH_BACKENDS[hash_backend]
+        n_bytes = -(-dim // 8)
+        self.n_bytes = n_bytes if max_digest_size is None else min(n_bytes, max_digest_size)
         
     def encode(self, text: str) -> np.ndarray:
         """Generate a simple hash-based embedding for text."""
         # This is a simplified approach for demo purposes
         # In production, use sentence-transformers, OpenAI embeddings, etc.
-        hash_obj = hashlib.sha256(text.encode())
-        hash_bytes = hash_obj.digest()
+        hash_bytes = self._digest(text.encode(), self.n_bytes)
         
-        # Convert to normalized vector
-        vec = np.frombuffer(hash_bytes[:self.dim//8], dtype=np.uint8)
-        vec = vec.astype(np.float32) / 255.0
+        # One component per digest bit; count truncates (or zero-fills) to dim
+        vec = np.unpackbits(np.frombuffer(hash_bytes, dtype=np.uint8), count=self.dim)
+        vec = vec.astype(np.float32)
         
-        # Pad or truncate to desired dimension
-        if len(vec) < self.dim:
-            vec = np.pad(vec, (0, self.dim - len(vec)), 'constant')
-        else:
-            vec = vec[:self.dim]
-            
-        # Normalize
-        norm = np.linalg.norm(vec)
-        if norm > 0:
-            vec = vec / norm
+        # Normalize in place; the squared norm of a bit vector is its popcount
+        ones = int(np.count_nonzero(vec))
+        if ones:
+            vec *= 1.0 / math.sqrt(ones)
             
         return vec
-    
+
+    def encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Generate hash-based embeddings for a batch of texts in one pass."""
+        n_bytes = self.n_bytes
+        digest = self._digest
+        
+        # Stack all digests into a single (N, n_bytes) uint8 buffer and unpack to bits
+        digests = b''.join(digest(text.encode(), n_bytes) for text in texts)
+        packed = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), n_bytes)
+        bits = np.unpackbits(packed, axis=1, count=self.dim)
+        
+        # Normalize all rows at once by their popcounts
+        ones = np.count_nonzero(bits, axis=1)
+        ones[ones == 0] = 1
+        vecs = bits.astype(np.float32)
+        vecs *= (1.0 / np.sqrt(ones, dtype=np.float32))[:, np.newaxis]
+        
+        return vecs
+        
     def similarity(self, emb1: np.ndarray, emb2: np.ndarray) -> float:
         """Calculate cosine similarity between embeddings."""
         return float(np.dot(emb1, emb2))
@@ -87,10 +143,33 @@ class DriftDetectCommand(StreamingCommand):
         validate=validators.Integer(1, 10000)
     )
     
+    quantize = Option(
+        doc='Store baselines as int8 (4x less memory, similarity accurate to ~0.05)',
+        require=False,
+        default=False,
+        validate=validators.Boolean()
+    )
+    
+    hash_backend = Option(
+        doc='Embedding hash: sha256 (default) or blake3 (faster, needs the blake3 package; '
+            'baselines must be built with the same hash)',
+        require=False,
+        default='sha256',
+        validate=validators.Set('sha256', 'blake3')
+    )
+    
+    # Number of records embedded together per batch
+    batch_size = 256
+    
     def __init__(self):
         super(DriftDetectCommand, self).__init__()
         self.embedder = SimpleEmbedder()
         self.baseline_embeddings = []
+        self.baseline_matrix = np.empty((0, self.embedder.dim), dtype=np.float32)
+        self.baseline_q = None
+        self.recent_matrix = None
+        self._recent_pos = 0
+        self._recent_count = 0
         self.logger = logging.getLogger(__name__)
         
     def load_baseline(self, baseline_file: str) -> List[np.ndarray]:
@@ -102,17 +181,22 @@ class DriftDetectCommand(StreamingCommand):
             file_path = app_path + baseline_file
             
             with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if 'embedding' in row:
-                        # Parse embedding from string representation
-                        emb_str = row['embedding'].strip('[]')
-                        emb_values = [float(x) for x in emb_str.split(',')]
-                        baselines.append(np.array(emb_values))
-                    elif 'text' in row:
-                        # Generate embedding from text
-                        embedding = self.embedder.encode(row['text'])
-                        baselines.append(embedding)
+                rows = list(csv.DictReader(f))
+            
+            if rows and 'embedding' in rows[0]:
+                # Parse embeddings from string representation straight into a
+                # preallocated matrix; a malformed row fails the shape check
+                first = self._parse_embedding(rows[0]['embedding'])
+                baseline_matrix = np.empty((len(rows), len(first)), dtype=np.float32)
+                baseline_matrix[0] = first
+                for i in range(1, len(rows)):
+                    baseline_matrix[i] = self._parse_embedding(rows[i]['embedding'])
+                self.baseline_matrix = baseline_matrix
+                baselines = list(baseline_matrix)
+            elif rows and 'text' in rows[0]:
+                # Generate embeddings for all baseline texts in one batch
+                self.baseline_matrix = self.embedder.encode_batch([row['text'] for row in rows])
+                baselines = list(self.baseline_matrix)
                         
         except FileNotFoundError:
             self.logger.warning(f"Baseline file {baseline_file} not found. Using empty baseline.")
@@ -121,39 +205,91 @@ class DriftDetectCommand(StreamingCommand):
             
         return baselines
     
-    def calculate_drift_score(self, text: str, baselines: List[np.ndarray]) -> float:
-        """Calculate drift score for given text against baselines."""
-        if not baselines:
+    @staticmethod
+    def _parse_embedding(emb_str: str) -> np.ndarray:
+        """Parse a stored embedding such as "[0.1, 0.2, ...]" in a single C loop."""
+        return np.fromstring(emb_str.strip('[] \n'), sep=',', dtype=np.float32)
+    
+    def calculate_drift_score(self, current_embedding: np.ndarray, baseline_matrix: np.ndarray) -> float:
+        """Calculate drift score for an embedding against a (B, dim) baseline matrix."""
+        if not len(baseline_matrix):
             return 0.0
-            
-        current_embedding = self.embedder.encode(text)
         
-        # Calculate similarities with all baselines
-        similarities = []
-        for baseline in baselines:
-            sim = self.embedder.similarity(current_embedding, baseline)
-            similarities.append(sim)
+        # Calculate similarities with all baselines in one matrix-vector product
+        similarities = baseline_matrix @ current_embedding
         
         # Drift score is 1 - max_similarity (higher means more drift)
-        max_similarity = max(similarities) if similarities else 0.0
-        drift_score = 1.0 - max_similarity
+        return 1.0 - float(similarities.max())
+    
+    def calculate_quantized_drift_score(self, current_embedding: np.ndarray, baseline_q: np.ndarray) -> float:
+        """Calculate drift score against int8-quantized baselines."""
+        # Accumulate the int8 products in int32 without widening the baseline matrix
+        similarities = np.matmul(baseline_q, quantize_embeddings(current_embedding), dtype=np.int32)
+        # Rounding can push a self-similarity slightly above 1
+        return max(0.0, 1.0 - float(similarities.max()) * QUANT_SCALE ** -2)
+    
+    def _recent_similarity(self, current_embedding: np.ndarray) -> float:
+        """Calculate mean similarity with the last (up to 10) recent samples."""
+        n_recent = min(10, self._recent_count)
+        if not n_recent:
+            return 1.0
+        
+        start = self._recent_pos - n_recent
+        if start >= 0:
+            recent = self.recent_matrix[start:self._recent_pos]
+        else:
+            # Recent samples wrap around the end of the ring buffer
+            recent = np.concatenate((self.recent_matrix[start:], self.recent_matrix[:self._recent_pos]))
         
-        return drift_score
+        return float((recent @ current_embedding).mean())
+    
+    def _add_recent(self, current_embedding: np.ndarray):
+        """Store an embedding in the recent samples ring buffer."""
+        self.recent_matrix[self._recent_pos] = current_embedding
+        self._recent_pos = (self._recent_pos + 1) % self.window_size
+        self._recent_count = min(self._recent_count + 1, self.window_size)
     
     def stream(self, records):
-        """Process each record and add drift detection fields."""
+        """Process records in batches and add drift detection fields."""
+        
+        # The embedder is created with the default hash before options are parsed
+        if self.embedder.hash_backend != self.hash_backend:
+            self.embedder = SimpleEmbedder(self.embedder.dim, self.hash_backend)
         
         # Load baselines once
         if not self.baseline_embeddings:
             self.baseline_embeddings = self.load_baseline(self.baseline_file)
-            
-        recent_embeddings = []
+            if self.quantize and len(self.baseline_matrix):
+                self.baseline_q = quantize_embeddings(self.baseline_matrix)
+        
+        # Ring buffer of recent embeddings (for trending), allocated once and kept
+        # across stream() calls so chunked searches trend over the whole result set
+        if self.recent_matrix is None or len(self.recent_matrix) != self.window_size:
+            self.recent_matrix = np.empty((self.window_size, self.embedder.dim), dtype=np.float32)
+            self._recent_pos = 0
+            self._recent_count = 0
+        
+        batch = []
         
         for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield from self._process_batch(batch)
+                batch = []
+        
+        if batch:
+            yield from self._process_batch(batch)
+    
+    def _process_batch(self, batch: List[Dict[str, Any]]):
+        """Encode a batch of records at once and add drift detection fields."""
+        texts = [record.get(self.field, '') for record in batch]
+        embeddings = self.embedder.encode_batch(
+            [text for text in texts if text and isinstance(text, str)]
+        )
+        emb_index = 0
+        
+        for record, text_value in zip(batch, texts):
             try:
-                # Get text field value
-                text_value = record.get(self.field, '')
-                
                 if not text_value:
                     record['drift_score'] = 0.0
                     record['drift_detected'] = False
@@ -161,26 +297,21 @@ class DriftDetectCommand(StreamingCommand):
                     yield record
                     continue
                 
+                if not isinstance(text_value, str):
+                    raise TypeError(f"Field {self.field} does not contain a single text value")
+                
+                current_emb = embeddings[emb_index]
+                emb_index += 1
+                
                 # Calculate drift against baselines
-                drift_score = self.calculate_drift_score(text_value, self.baseline_embeddings)
+                if self.baseline_q is not None:
+                    drift_score = self.calculate_quantized_drift_score(current_emb, self.baseline_q)
+                else:
+                    drift_score = self.calculate_drift_score(current_emb, self.baseline_matrix)
                 
                 # Calculate similarity with recent samples (for trending)
-                recent_similarity = 1.0
-                if recent_embeddings:
-                    current_emb = self.embedder.encode(text_value)
-                    recent_sims = [
-                        self.embedder.similarity(current_emb, emb) 
-                        for emb in recent_embeddings[-min(10, len(recent_embeddings)):]
-                    ]
-                    recent_similarity = np.mean(recent_sims) if recent_sims else 1.0
-                    
-                    # Add current embedding to recent samples
-                    recent_embeddings.append(current_emb)
-                    if len(recent_embeddings) > self.window_size:
-                        recent_embeddings = recent_embeddings[-self.window_size:]
-                else:
-                    # First sample - add to recent embeddings
-                    recent_embeddings.append(self.embedder.encode(text_value))
+                recent_similarity = self._recent_similarity(current_emb)
+                self._add_recent(current_emb)
                 
                 # Add drift detection fields
                 record['drift_score'] = round(drift_score, 4)
@@ -215,4 +346,6 @@ class DriftDetectCommand(StreamingCommand):
             return "critical"
 
 if __name__ == '__main__':
+    # Serialize output records with orjson when it is installed
+    _fast_json.install()
     dispatch(DriftDetectCommand, sys.argv, sys.stdin, sys.stdout, __name__)
@@ -5,18 +5,148 @@ Calculates comprehensive performance metrics for LLM interactions
 """
 
 import sys
-import json
-import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple, TYPE_CHECKING
 import logging
 import re
 from datetime import datetime
-import statistics
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass
+
+# NumPy is only needed for trend history, so it is imported on first use to
+# keep process startup (paid once per search) short
+if TYPE_CHECKING:
+    import numpy as np
 
 # Splunk SDK imports
 sys.path.insert(0, '/opt/splunk/lib/python3.9/site-packages')
 from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
 
+def _format_metric(value):
+    """Format a float to 4 decimal places for output; other values are returned unchanged."""
+    return f'{value:.4f}' if isinstance(value, float) else value
+
+# Metric names returned by the calculator, used to build the prefixed output
+# field names once per command instead of per record. Built names are
+# interned so every record shares the same key objects
+QUALITY_METRIC_KEYS = ('response_length', 'word_count', 'sentence_count', 'avg_word_length',
+                       'readability_score', 'coherence_score', 'completeness_score',
+                       'language_quality', 'information_density')
+PERFORMANCE_METRIC_KEYS = ('response_time', 'tokens_per_second', 'time_per_token', 'token_count',
+                           'performance_category', 'confidence_score', 'confidence_category')
+TREND_METRICS = ('response_time', 'token_count', 'confidence_score', 'coherence_score')
+TREND_FIELD_NAMES = {metric: tuple(sys.intern(f'{metric}_{suffix}')
+                                    for suffix in ('trend_pct', 'trend_direction', 'volatility'))
+                     for metric in TREND_METRICS}
+TREND_METRIC_KEYS = tuple(key for names in TREND_FIELD_NAMES.values() for key in names)
+
+# Category thresholds. Performance tiers run best to worst: excellent needs a
+# response time under 1 s and more than 100 tokens/s, and so on
+PERFORMANCE_TIME_LIMITS = (1.0, 3.0, 10.0)
+PERFORMANCE_TPS_LIMITS = (20, 50, 100)
+PERFORMANCE_LABELS = ('excellent', 'good', 'acceptable', 'poor')
+CONFIDENCE_THRESHOLDS = (0.3, 0.5, 0.7, 0.9)
+CONFIDENCE_LABELS = ('very_low', 'low', 'medium', 'high', 'very_high')
+
+# Keyword tables for the coherence and completeness heuristics. Phrases match
+# as substrings of the lowercased response. KEYWORD_RE finds every phrase of
+# all three tables in one pass; the lookahead also reports overlapping
+# phrases (e.g. "furthermore" and "moreover", "for example" and "example")
+TRANSITION_WORDS = frozenset({'however', 'therefore', 'furthermore', 'additionally', 'moreover',
+                              'consequently', 'meanwhile', 'similarly', 'in contrast', 'for example'})
+CONCLUSION_WORDS = frozenset({'conclusion', 'summary', 'finally', 'therefore'})
+EXAMPLE_WORDS = frozenset({'example', 'instance', 'such as'})
+KEYWORD_RE = re.compile('(?=(' + '|'.join(map(re.escape, sorted(TRANSITION_WORDS | CONCLUSION_WORDS | EXAMPLE_WORDS,
+                                                              key=len, reverse=True))) + '))')
+
+# Sentence boundaries: runs of terminal punctuation
+_SENT_RE = re.compile(r'[.!?]+')
+
+PRONOUNS = frozenset({'it', 'this', 'that', 'these', 'those', 'they', 'them'})
+STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
+                        'with', 'by', 'is', 'are', 'was', 'were'})
+
+@dataclass
+class TextFeatures:
+    """Tokenization of a response shared by all quality metrics."""
+    text: str
+    lower_text: str
+    words: List[str]
+    lower_words: List[str]
+    word_counts: Counter
+    word_set: Set[str]
+    sentences: List[str]
+    keywords: Set[str]
+    n_words: int
+    n_chars: int
+    mean_word_len: float
+    content_words: int
+    
+    @classmethod
+    def from_text(cls, text: str) -> 'TextFeatures':
+        """Tokenize text once into words, lowercase words, sentences and keyword phrases."""
+        lower_text = text.lower()
+        words = text.split()
+        lower_words = lower_text.split()
+        word_counts = Counter(lower_words)
+        n_words = len(words)
+        
+        # Content words are the words that are not stop words
+        stop_count = sum(word_counts[w] for w in STOP_WORDS if w in word_counts)
+        
+        return cls(
+            text=text,
+            lower_text=lower_text,
+            words=words,
+            lower_words=lower_words,
+            word_counts=word_counts,
+            word_set=set(word_counts),
+            sentences=[s for s in map(str.strip, _SENT_RE.split(text)) if s],
+            keywords=set(KEYWORD_RE.findall(lower_text)),
+            n_words=n_words,
+            n_chars=len(text),
+            mean_word_len=sum(map(len, words)) / n_words if n_words else 0.0,
+            content_words=len(lower_words) - stop_count
+        )
+
+class HistoricalMetricsRing:
+    """Fixed-size history of recent metrics, stored as one array per metric."""
+    
+    def __init__(self, keys: Tuple[str, ...], capacity: int = 100):
+        self.keys = keys
+        self.capacity = capacity
+        self.buffers = {}
+        self.mask = {}
+        self.head = 0
+        self.n = 0
+    
+    def __len__(self) -> int:
+        return self.n
+    
+    def append(self, metrics: Dict[str, float]):
+        """Store one record's metrics, overwriting the oldest record once full."""
+        if not self.buffers:
+            # Allocate on first use so NumPy is only loaded when trends are enabled
+            import numpy as np
+            self.buffers = {key: np.zeros(self.capacity, dtype=np.float64) for key in self.keys}
+            self.mask = {key: np.zeros(self.capacity, dtype=bool) for key in self.keys}
+        
+        head = self.head
+        for key, buffer in self.buffers.items():
+            present = key in metrics
+            self.mask[key][head] = present
+            if present:
+                buffer[head] = metrics[key]
+        
+        self.head = (head + 1) % self.capacity
+        self.n = min(self.n + 1, self.capacity)
+    
+    def values(self, key: str) -> 'np.ndarray':
+        """Stored values of a metric for the records that had it (in slot order)."""
+        n = self.n
+        return self.buffers[key][:n][self.mask[key][:n]]
+
 class LLMMetricsCalculator:
     """Calculator for LLM performance and quality metrics."""
     
@@ -26,27 +156,28 @@ class LLMMetricsCalculator:
     def calculate_response_quality(self, response: str, prompt: str = None) -> Dict[str, float]:
         """Calculate quality metrics for LLM response."""
         metrics = {}
+        features = TextFeatures.from_text(response)
         
         # Basic text metrics
-        metrics['response_length'] = len(response)
-        metrics['word_count'] = len(response.split())
-        metrics['sentence_count'] = len([s for s in response.split('.') if s.strip()])
-        metrics['avg_word_length'] = np.mean([len(word) for word in response.split()]) if response.split() else 0
+        metrics['response_length'] = features.n_chars
+        metrics['word_count'] = features.n_words
+        metrics['sentence_count'] = len(features.sentences)
+        metrics['avg_word_length'] = features.mean_word_len if features.n_words else 0
         
         # Readability metrics (simplified)
-        metrics['readability_score'] = self._calculate_readability(response)
+        metrics['readability_score'] = self._calculate_readability(features)
         
         # Coherence indicators
-        metrics['coherence_score'] = self._calculate_coherence(response)
+        metrics['coherence_score'] = self._calculate_coherence(features)
         
         # Completeness indicators
-        metrics['completeness_score'] = self._calculate_completeness(response, prompt)
+        metrics['completeness_score'] = self._calculate_completeness(features, prompt)
         
         # Language quality
-        metrics['language_quality'] = self._calculate_language_quality(response)
+        metrics['language_quality'] = self._calculate_language_quality(features)
         
         # Information density
-        metrics['information_density'] = self._calculate_information_density(response)
+        metrics['information_density'] = self._calculate_information_density(features)
         
         return metrics
     
@@ -74,89 +205,84 @@ class LLMMetricsCalculator:
         return metrics
     
     def calculate_trend_metrics(self, current_metrics: Dict[str, float], 
-                              historical_metrics: List[Dict[str, float]]) -> Dict[str, float]:
+                              history: HistoricalMetricsRing) -> Dict[str, float]:
         """Calculate trend and comparison metrics."""
         trends = {}
         
-        if not historical_metrics:
+        if not len(history):
             return trends
         
         # Calculate trends for key metrics
-        key_metrics = ['response_time', 'token_count', 'confidence_score', 'coherence_score']
-        
-        for metric in key_metrics:
+        for metric in TREND_METRICS:
             if metric in current_metrics:
-                historical_values = [m.get(metric, 0) for m in historical_metrics if metric in m]
+                pct_key, direction_key, volatility_key = TREND_FIELD_NAMES[metric]
+                historical_values = history.values(metric)
+                n_values = len(historical_values)
                 
-                if historical_values:
-                    avg_historical = np.mean(historical_values)
+                if n_values:
+                    avg_historical = float(historical_values.mean())
                     current_value = current_metrics[metric]
                     
                     # Percentage change
                     pct_change = ((current_value - avg_historical) / max(avg_historical, 0.001)) * 100
-                    trends[f'{metric}_trend_pct'] = pct_change
+                    trends[pct_key] = pct_change
                     
                     # Trend direction
-                    trends[f'{metric}_trend_direction'] = 'improving' if pct_change > 5 else 'declining' if pct_change < -5 else 'stable'
+                    trends[direction_key] = 'improving' if pct_change > 5 else 'declining' if pct_change < -5 else 'stable'
                     
                     # Volatility (standard deviation)
-                    if len(historical_values) > 1:
-                        trends[f'{metric}_volatility'] = np.std(historical_values)
+                    if n_values > 1:
+                        trends[volatility_key] = float(historical_values.std())
         
         return trends
     
-    def _calculate_readability(self, text: str) -> float:
+    def _calculate_readability(self, features: TextFeatures) -> float:
         """Calculate simplified readability score."""
-        if not text:
+        if not features.n_chars:
             return 0.0
         
-        sentences = [s for s in text.split('.') if s.strip()]
-        words = text.split()
+        sentences = features.sentences
         
-        if not sentences or not words:
+        if not sentences or not features.n_words:
             return 0.0
         
         # Simplified Flesch-like score
-        avg_sentence_length = len(words) / len(sentences)
-        avg_word_length = np.mean([len(word) for word in words])
+        avg_sentence_length = features.n_words / len(sentences)
+        avg_word_length = features.mean_word_len
         
         # Normalize to 0-1 scale (lower is more readable)
         readability = 1.0 - min(1.0, (avg_sentence_length / 20 + avg_word_length / 6) / 2)
         return max(0.0, readability)
     
-    def _calculate_coherence(self, text: str) -> float:
+    def _calculate_coherence(self, features: TextFeatures) -> float:
         """Calculate coherence score based on text structure."""
-        if not text:
+        if not features.n_chars:
             return 0.0
         
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
+        sentences = features.sentences
         
         if len(sentences) < 2:
             return 1.0
         
-        # Check for transition words and coherence indicators
-        transition_words = ['however', 'therefore', 'furthermore', 'additionally', 'moreover', 
-                          'consequently', 'meanwhile', 'similarly', 'in contrast', 'for example']
-        
-        transition_count = sum(1 for word in transition_words if word in text.lower())
+        # Check for transition words and coherence indicators (distinct phrases, one scan)
+        transition_count = len(TRANSITION_WORDS.intersection(features.keywords))
         
         # Check for pronoun consistency and reference
-        pronouns = ['it', 'this', 'that', 'these', 'those', 'they', 'them']
-        pronoun_count = sum(1 for word in pronouns if word in text.lower().split())
+        pronoun_count = len(PRONOUNS.intersection(features.word_set))
         
         # Simple coherence score
         coherence = min(1.0, (transition_count * 0.1 + pronoun_count * 0.05) / len(sentences))
         return coherence
     
-    def _calculate_completeness(self, response: str, prompt: str = None) -> float:
+    def _calculate_completeness(self, features: TextFeatures, prompt: str = None) -> float:
         """Calculate response completeness."""
-        if not response:
+        if not features.n_chars:
             return 0.0
         
         # Basic completeness indicators
-        has_conclusion = any(word in response.lower() for word in ['conclusion', 'summary', 'finally', 'therefore'])
-        has_examples = any(word in response.lower() for word in ['example', 'instance', 'such as', 'for example'])
-        has_structure = len([s for s in response.split('.') if s.strip()]) >= 2
+        has_conclusion = not CONCLUSION_WORDS.isdisjoint(features.keywords)
+        has_examples = not EXAMPLE_WORDS.isdisjoint(features.keywords)
+        has_structure = len(features.sentences) >= 2
         
         completeness = 0.0
         if has_conclusion:
@@ -170,66 +296,56 @@ class LLMMetricsCalculator:
         if prompt:
             # Simple keyword overlap
             prompt_words = set(prompt.lower().split())
-            response_words = set(response.lower().split())
-            overlap = len(prompt_words.intersection(response_words)) / max(len(prompt_words), 1)
+            overlap = len(prompt_words.intersection(features.word_set)) / max(len(prompt_words), 1)
             completeness = (completeness + overlap) / 2
         
         return min(1.0, completeness)
     
-    def _calculate_language_quality(self, text: str) -> float:
+    def _calculate_language_quality(self, features: TextFeatures) -> float:
         """Calculate language quality score."""
-        if not text:
+        if not features.n_chars:
             return 0.0
         
         # Check for common language issues
-        repeated_words = self._check_repetition(text)
-        grammar_score = self._simple_grammar_check(text)
-        vocabulary_diversity = self._calculate_vocabulary_diversity(text)
+        repeated_words = self._check_repetition(features)
+        grammar_score = self._simple_grammar_check(features)
+        vocabulary_diversity = self._calculate_vocabulary_diversity(features)
         
         # Combine scores
         quality = (grammar_score * 0.5 + vocabulary_diversity * 0.3 + (1 - repeated_words) * 0.2)
         return max(0.0, min(1.0, quality))
     
-    def _calculate_information_density(self, text: str) -> float:
+    def _calculate_information_density(self, features: TextFeatures) -> float:
         """Calculate information density of the text."""
-        if not text:
+        if not features.n_chars:
             return 0.0
         
-        words = text.split()
-        
-        # Count content words (non-stop words)
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were'}
-        content_words = [word for word in words if word.lower() not in stop_words]
-        
-        # Information density = content words / total words
-        return len(content_words) / max(len(words), 1)
+        # Information density = content words (non-stop words) / total words
+        return features.content_words / max(features.n_words, 1)
     
-    def _check_repetition(self, text: str) -> float:
+    def _check_repetition(self, features: TextFeatures) -> float:
         """Check for excessive word repetition."""
-        words = text.lower().split()
+        words = features.lower_words
         if len(words) < 2:
             return 0.0
         
-        word_counts = {}
-        for word in words:
-            word_counts[word] = word_counts.get(word, 0) + 1
-        
         # Calculate repetition ratio
-        max_count = max(word_counts.values())
+        max_count = max(features.word_counts.values())
         repetition_ratio = max_count / len(words)
         
         # Return high repetition score for problematic repetition
         return max(0.0, repetition_ratio - 0.1)  # Allow 10% repetition as normal
     
-    def _simple_grammar_check(self, text: str) -> float:
+    def _simple_grammar_check(self, features: TextFeatures) -> float:
         """Simple grammar quality check."""
         # Check for basic grammar patterns
+        text = features.text
         has_capital_start = text and text[0].isupper()
-        has_proper_punctuation = text.endswith('.') or text.endswith('!') or text.endswith('?')
+        has_proper_punctuation = text.endswith(('.', '!', '?'))
         
         # Check sentence structure
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
-        proper_sentences = sum(1 for s in sentences if s and s[0].isupper())
+        sentences = features.sentences
+        proper_sentences = sum(1 for s in sentences if s[:1].isupper())
         sentence_quality = proper_sentences / max(len(sentences), 1)
         
         # Simple score
@@ -242,13 +358,13 @@ class LLMMetricsCalculator:
         
         return min(1.0, grammar_score)
     
-    def _calculate_vocabulary_diversity(self, text: str) -> float:
+    def _calculate_vocabulary_diversity(self, features: TextFeatures) -> float:
         """Calculate vocabulary diversity (Type-Token Ratio)."""
-        words = text.lower().split()
+        words = features.lower_words
         if not words:
             return 0.0
         
-        unique_words = len(set(words))
+        unique_words = len(features.word_counts)
         total_words = len(words)
         
         # Type-Token Ratio
@@ -258,27 +374,17 @@ class LLMMetricsCalculator:
         """Categorize overall performance."""
         tokens_per_second = token_count / max(response_time, 0.001)
         
-        if response_time < 1.0 and tokens_per_second > 100:
-            return "excellent"
-        elif response_time < 3.0 and tokens_per_second > 50:
-            return "good"
-        elif response_time < 10.0 and tokens_per_second > 20:
-            return "acceptable"
-        else:
-            return "poor"
+        # A record gets the best tier whose response time and throughput
+        # limits it meets, i.e. the worse of its two individual tiers
+        time_tier = bisect_right(PERFORMANCE_TIME_LIMITS, response_time)
+        throughput_tier = len(PERFORMANCE_TPS_LIMITS) - bisect_left(PERFORMANCE_TPS_LIMITS, tokens_per_second)
+        return PERFORMANCE_LABELS[max(time_tier, throughput_tier)]
     
     def _categorize_confidence(self, confidence: float) -> str:
         """Categorize confidence score."""
-        if confidence >= 0.9:
-            return "very_high"
-        elif confidence >= 0.7:
-            return "high"
-        elif confidence >= 0.5:
-            return "medium"
-        elif confidence >= 0.3:
-            return "low"
-        else:
-            return "very_low"
+        if confidence != confidence:  # NaN fails every threshold
+            return CONFIDENCE_LABELS[0]
+        return CONFIDENCE_LABELS[bisect_right(CONFIDENCE_THRESHOLDS, confidence)]
 
 @Configuration()
 class LLMMetricsCommand(StreamingCommand):
@@ -329,8 +435,19 @@ class LLMMetricsCommand(StreamingCommand):
     def __init__(self):
         super(LLMMetricsCommand, self).__init__()
         self.calculator = LLMMetricsCalculator()
-        self.historical_metrics = []
+        self.historical_metrics = HistoricalMetricsRing(TREND_METRICS, capacity=100)
         self.logger = logging.getLogger(__name__)
+        self._quality_keys = {key: sys.intern(f'quality_{key}') for key in QUALITY_METRIC_KEYS}
+        self._perf_keys = {key: sys.intern(f'perf_{key}') for key in PERFORMANCE_METRIC_KEYS}
+        self._trend_keys = {key: sys.intern(f'trend_{key}') for key in TREND_METRIC_KEYS}
+        self._ts_cache = (0.0, '')
+    
+    def _timestamp(self) -> str:
+        """ISO timestamp of the current time, refreshed at most every 50 ms."""
+        now = time.time()
+        if now - self._ts_cache[0] > 0.05:
+            self._ts_cache = (now, datetime.fromtimestamp(now).isoformat())
+        return self._ts_cache[1]
     
     def stream(self, records):
         """Process each record and add LLM metrics."""
@@ -353,8 +470,8 @@ class LLMMetricsCommand(StreamingCommand):
                 quality_metrics = self.calculator.calculate_response_quality(response, prompt)
                 
                 # Add quality metrics to record
-                for key, value in quality_metrics.items():
-                    record[f'quality_{key}'] = round(value, 4)
+                quality_keys = self._quality_keys
+                record.update({quality_keys[key]: _format_metric(value) for key, value in quality_metrics.items()})
                 
                 # Calculate performance metrics if available
                 if response_time is not None and token_count is not None:
@@ -362,14 +479,11 @@ class LLMMetricsCommand(StreamingCommand):
                         response_time, token_count, confidence
                     )
                     
-                    for key, value in perf_metrics.items():
-                        if isinstance(value, (int, float)):
-                            record[f'perf_{key}'] = round(value, 4)
-                        else:
-                            record[f'perf_{key}'] = value
+                    perf_keys = self._perf_keys
+                    record.update({perf_keys[key]: _format_metric(value) for key, value in perf_metrics.items()})
                 
                 # Calculate trend metrics if enabled
-                if self.include_trends and self.historical_metrics:
+                if self.include_trends:
                     current_metrics = {**quality_metrics}
                     if response_time is not None:
                         current_metrics['response_time'] = response_time
@@ -378,32 +492,28 @@ class LLMMetricsCommand(StreamingCommand):
                     if confidence is not None:
                         current_metrics['confidence_score'] = confidence
                     
+                    # Compare against the history of previous records
                     trend_metrics = self.calculator.calculate_trend_metrics(
                         current_metrics, self.historical_metrics
                     )
                     
-                    for key, value in trend_metrics.items():
-                        if isinstance(value, (int, float)):
-                            record[f'trend_{key}'] = round(value, 4)
-                        else:
-                            record[f'trend_{key}'] = value
+                    trend_keys = self._trend_keys
+                    record.update({trend_keys[key]: _format_metric(value) for key, value in trend_metrics.items()})
                     
-                    # Add current metrics to historical data
+                    # Add current metrics to historical data (keeps the last 100 records)
                     self.historical_metrics.append(current_metrics)
-                    if len(self.historical_metrics) > 100:  # Keep last 100 records
-                        self.historical_metrics = self.historical_metrics[-100:]
                 
                 # Calculate overall quality score
-                quality_score = np.mean([
-                    quality_metrics.get('readability_score', 0),
-                    quality_metrics.get('coherence_score', 0),
-                    quality_metrics.get('completeness_score', 0),
+                quality_score = (
+                    quality_metrics.get('readability_score', 0) +
+                    quality_metrics.get('coherence_score', 0) +
+                    quality_metrics.get('completeness_score', 0) +
                     quality_metrics.get('language_quality', 0)
-                ])
-                record['overall_quality_score'] = round(quality_score, 4)
+                ) / 4
+                record['overall_quality_score'] = _format_metric(quality_score)
                 
                 # Add timestamp
-                record['metrics_calculated_at'] = datetime.now().isoformat()
+                record['metrics_calculated_at'] = self._timestamp()
                 
             except Exception as e:
                 self.logger.error(f"Error calculating LLM metrics: {str(e)}")
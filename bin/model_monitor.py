@@ -5,26 +5,243 @@ Detects statistical anomalies in LLM behavior patterns
 """
 
 import sys
-import json
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import logging
 from datetime import datetime
-import statistics
-from collections import defaultdict, deque
+import time
+import math
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import islice
+from functools import partial
 
 # Splunk SDK imports
 sys.path.insert(0, '/opt/splunk/lib/python3.9/site-packages')
 from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
 
+import _fast_json
+
+# Anomaly severity levels; each score limit is where the next level starts
+SEVERITY_LABELS = ('none', 'low', 'medium', 'high', 'critical')
+SEVERITY_SCORE_LIMITS = (3.0, 5.0, 8.0)
+
+# Records are read from Splunk and analysed in blocks of this size
+BATCH_SIZE = 512
+
+def _format_metric(value):
+    """Format a float to 4 decimal places for output; other values are returned unchanged."""
+    return f'{value:.4f}' if isinstance(value, float) else value
+
+class _RollingStats:
+    """Sliding window of values with a running mean and sum of squared deviations.
+    
+    Values live in a preallocated ring buffer so detectors can read them as
+    NumPy views instead of copying the window on every record.
+    """
+    
+    def __init__(self, maxlen: int):
+        self.buf = np.empty(maxlen, dtype=np.float64)
+        self.maxlen = maxlen
+        self.head = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._m2_peak = 0.0
+        self._equal_run = 0
+        self._updates = 0
+    
+    def __len__(self) -> int:
+        return self.n
+    
+    def view(self) -> np.ndarray:
+        """Window values as a zero-copy view, in buffer order rather than arrival order."""
+        return self.buf[:self.n]
+    
+    def tail(self, k: int) -> np.ndarray:
+        """Last k values (k <= len) in arrival order; a view unless they wrap around the buffer."""
+        head = self.head
+        if k <= head:
+            return self.buf[head - k:head]
+        return np.concatenate((self.buf[self.maxlen - (k - head):], self.buf[:head]))
+    
+    def append(self, value: float):
+        """Add a value, evicting the oldest one once the window is full (Welford update)."""
+        buf = self.buf
+        head = self.head
+        n = self.n
+        
+        # Length of the run of equal values at the end of the window
+        self._equal_run = self._equal_run + 1 if n and value == buf.item(head - 1) else 1
+        
+        if n == self.maxlen:
+            evicted = buf.item(head)
+            buf[head] = value
+            old_mean = self.mean
+            self.mean += (value - evicted) / n
+            self.m2 += (value - evicted) * (value - self.mean + evicted - old_mean)
+        else:
+            buf[head] = value
+            self.n = n + 1
+            delta = value - self.mean
+            self.mean += delta / (n + 1)
+            self.m2 += delta * (value - self.mean)
+        
+        self.head = head + 1 if head + 1 < self.maxlen else 0
+        
+        # Recompute exactly once per window length to shed accumulated rounding
+        # error, when the sum of squares has cancelled far below its recent peak
+        # (large values leaving the window), and after non-finite values
+        self._updates += 1
+        self._m2_peak = max(self._m2_peak, self.m2)
+        if (self._updates >= self.maxlen or self.m2 < self._m2_peak * 1e-6
+                or not math.isfinite(self.m2)):
+            self._recompute()
+    
+    def extend(self, values: np.ndarray):
+        """Add several values in arrival order, then recompute the running statistics exactly."""
+        k = len(values)
+        if not k:
+            return
+        
+        # Extend the run of equal values at the end of the window
+        last = values[-1]
+        differs = np.flatnonzero(values[::-1] != last)
+        run = int(differs[0]) if len(differs) else k
+        if run == k and self.n and self.buf[self.head - 1] == last:
+            run += self._equal_run
+        self._equal_run = max(run, 1)
+        
+        maxlen = self.maxlen
+        if k >= maxlen:
+            self.buf[:] = values[k - maxlen:]
+            self.head = 0
+        else:
+            self.buf[(self.head + np.arange(k)) % maxlen] = values
+            self.head = (self.head + k) % maxlen
+        self.n = min(self.n + k, maxlen)
+        self._recompute()
+    
+    def _recompute(self):
+        """Recompute the running statistics from the window values."""
+        values = self.buf[:self.n].tolist()
+        self.mean = math.fsum(values) / len(values)
+        self.m2 = math.fsum((v - self.mean) * (v - self.mean) for v in values)
+        self._m2_peak = self.m2
+        self._updates = 0
+    
+    def stdev(self) -> float:
+        """Sample standard deviation of the window (exactly 0.0 when all values are equal)."""
+        n = self.n
+        if n < 2 or self._equal_run >= n:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (n - 1))
+
 class AnomalyDetector:
     """Statistical anomaly detection for LLM metrics."""
     
     def __init__(self, window_size: int = 100):
         self.window_size = window_size
-        self.metric_windows = defaultdict(lambda: deque(maxlen=window_size))
+        self.metric_windows = defaultdict(lambda: _RollingStats(window_size))
         self.logger = logging.getLogger(__name__)
     
+    def detect_batch(self, detect: Callable[[float, str], Tuple[bool, float, Dict[str, Any]]],
+                     values: np.ndarray, field_name: str) -> List[Tuple[int, float, Dict[str, Any]]]:
+        """Run a per-value detector over values in order; returns (index, score, analysis) per anomaly."""
+        anomalies = []
+        for i, value in enumerate(values.tolist()):
+            is_anomaly, score, analysis = detect(value, field_name)
+            if is_anomaly:
+                anomalies.append((i, score, analysis))
+        return anomalies
+    
+    def _full_windows(self, detect: Callable[[float, str], Tuple[bool, float, Dict[str, Any]]],
+                      values: np.ndarray, field_name: str):
+        """Split values into those seen while the window fills up and those with a full window.
+        
+        The first group is run through the per-value detector. Returns its
+        anomalies, the offset and values of the second group, and a
+        (len(rest), maxlen) view holding the full window ending at each of them.
+        """
+        window = self.metric_windows[field_name]
+        n_warmup = min(len(values), window.maxlen - len(window))
+        anomalies = self.detect_batch(detect, values[:n_warmup], field_name)
+        
+        rest = values[n_warmup:]
+        if not len(rest):
+            return anomalies, n_warmup, rest, None
+        
+        history = window.tail(window.maxlen - 1)
+        windows = np.lib.stride_tricks.sliding_window_view(np.concatenate((history, rest)), window.maxlen)
+        window.extend(rest)
+        return anomalies, n_warmup, rest, windows
+    
+    def detect_zscore_batch(self, values: np.ndarray, field_name: str, threshold: float = 2.0) -> List[Tuple[int, float, Dict[str, Any]]]:
+        """Z-score detection for a block of values, vectorized once the window is full."""
+        anomalies, offset, rest, windows = self._full_windows(
+            partial(self.detect_zscore_anomaly, threshold=threshold), values, field_name
+        )
+        if windows is None or windows.shape[1] < 10:  # Need minimum samples
+            return anomalies
+        
+        n = windows.shape[1]
+        # Windows holding inf or values near the float limit overflow to inf
+        # or NaN here; keep the RuntimeWarnings out of search.log
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            mean = windows.mean(axis=1)
+            stdev = windows.std(axis=1, ddof=1)
+            # A window of equal values has exactly zero spread even if its mean rounds
+            stdev[windows.max(axis=1) == windows.min(axis=1)] = 0.0
+            zscore = (rest - mean) / stdev
+        hits = np.flatnonzero((stdev != 0) & (np.abs(zscore) > threshold))
+        
+        for i in hits.tolist():
+            anomalies.append((offset + i, abs(float(zscore[i])), {
+                'mean': float(mean[i]),
+                'stdev': float(stdev[i]),
+                'zscore': float(zscore[i]),
+                'threshold': threshold,
+                'sample_size': n
+            }))
+        return anomalies
+    
+    def detect_iqr_batch(self, values: np.ndarray, field_name: str, multiplier: float = 1.5) -> List[Tuple[int, float, Dict[str, Any]]]:
+        """IQR detection for a block of values, vectorized once the window is full."""
+        anomalies, offset, rest, windows = self._full_windows(
+            partial(self.detect_iqr_anomaly, multiplier=multiplier), values, field_name
+        )
+        if windows is None or windows.shape[1] < 10:
+            return anomalies
+        
+        n = windows.shape[1]
+        quartiles = np.partition(windows, (n // 4, 3 * n // 4), axis=1)
+        q1 = quartiles[:, n // 4]
+        q3 = quartiles[:, 3 * n // 4]
+        iqr = q3 - q1
+        
+        lower_bound = q1 - multiplier * iqr
+        upper_bound = q3 + multiplier * iqr
+        hits = np.flatnonzero((rest < lower_bound) | (rest > upper_bound))
+        
+        for i in hits.tolist():
+            value = float(rest[i])
+            lower, upper, spread = float(lower_bound[i]), float(upper_bound[i]), float(iqr[i])
+            if value < lower:
+                anomaly_score = (lower - value) / max(spread, 0.001)
+            else:
+                anomaly_score = (value - upper) / max(spread, 0.001)
+            
+            anomalies.append((offset + i, anomaly_score, {
+                'q1': float(q1[i]),
+                'q3': float(q3[i]),
+                'iqr': spread,
+                'lower_bound': lower,
+                'upper_bound': upper,
+                'multiplier': multiplier,
+                'sample_size': n
+            }))
+        return anomalies
+    
     def detect_zscore_anomaly(self, value: float, field_name: str, threshold: float = 2.0) -> Tuple[bool, float, Dict[str, Any]]:
         """Detect anomalies using Z-score method."""
         window = self.metric_windows[field_name]
@@ -33,9 +250,9 @@ class AnomalyDetector:
         if len(window) < 10:  # Need minimum samples
             return False, 0.0, {}
         
-        values = list(window)
-        mean_val = statistics.mean(values)
-        stdev_val = statistics.stdev(values) if len(values) > 1 else 0.0
+        # Running statistics are maintained by the window in O(1) per record
+        mean_val = window.mean
+        stdev_val = window.stdev()
         
         if stdev_val == 0:
             return False, 0.0, {}
@@ -48,7 +265,7 @@ class AnomalyDetector:
             'stdev': stdev_val,
             'zscore': zscore,
             'threshold': threshold,
-            'sample_size': len(values)
+            'sample_size': len(window)
         }
         
         return is_anomaly, abs(zscore), analysis
@@ -61,11 +278,13 @@ class AnomalyDetector:
         if len(window) < 10:
             return False, 0.0, {}
         
-        values = sorted(list(window))
-        n = len(values)
+        # Select the two quartiles in O(n) instead of sorting the window
+        # (np.partition copies, leaving the window buffer untouched)
+        n = len(window)
+        values = np.partition(window.view(), (n // 4, 3 * n // 4))
         
-        q1 = values[n // 4]
-        q3 = values[3 * n // 4]
+        q1 = float(values[n // 4])
+        q3 = float(values[3 * n // 4])
         iqr = q3 - q1
         
         lower_bound = q1 - multiplier * iqr
@@ -86,7 +305,7 @@ class AnomalyDetector:
             'lower_bound': lower_bound,
             'upper_bound': upper_bound,
             'multiplier': multiplier,
-            'sample_size': len(values)
+            'sample_size': n
         }
         
         return is_anomaly, anomaly_score, analysis
@@ -99,15 +318,16 @@ class AnomalyDetector:
         if len(window) < 20:
             return False, 0.0, {}
         
-        values = list(window)
+        n = len(window)
+        values = window.view()
         
         # Simple isolation score based on how far the value is from neighbors
-        distances = [abs(value - v) for v in values if v != value]
-        if not distances:
+        distances = np.abs(values[values != value] - value)
+        if not len(distances):
             return False, 0.0, {}
         
-        avg_distance = statistics.mean(distances)
-        std_distance = statistics.stdev(distances) if len(distances) > 1 else 0.0
+        avg_distance = float(distances.mean())
+        std_distance = float(distances.std(ddof=1)) if len(distances) > 1 else 0.0
         
         # Isolation score - higher means more isolated
         isolation_score = avg_distance / max(std_distance, 0.001)
@@ -117,7 +337,7 @@ class AnomalyDetector:
             'avg_distance': avg_distance,
             'std_distance': std_distance,
             'isolation_score': isolation_score,
-            'sample_size': len(values)
+            'sample_size': n
         }
         
         return is_anomaly, isolation_score, analysis
@@ -130,35 +350,19 @@ class AnomalyDetector:
         if len(window) < window_size:
             return False, 0.0, {}
         
-        values = list(window)[-window_size:]
-        
-        # Calculate trend using linear regression
-        x = list(range(len(values)))
+        values = window.tail(window_size)
         n = len(values)
         
         if n < 2:
             return False, 0.0, {}
         
-        # Simple linear regression
-        sum_x = sum(x)
-        sum_y = sum(values)
-        sum_xy = sum(x[i] * values[i] for i in range(n))
-        sum_x2 = sum(xi * xi for xi in x)
-        
-        denominator = n * sum_x2 - sum_x * sum_x
-        if denominator == 0:
-            return False, 0.0, {}
-        
-        slope = (n * sum_xy - sum_x * sum_y) / denominator
-        intercept = (sum_y - slope * sum_x) / n
+        # Calculate trend using linear regression. The kernel module (and numba)
+        # is imported on first use so searches without trend detection skip it
+        from _trend_core import trend_stats
+        slope, intercept, prediction_error, residual_std = map(float, trend_stats(values))
         
         # Predict current value based on trend
         predicted = slope * (n - 1) + intercept
-        prediction_error = abs(value - predicted)
-        
-        # Calculate residuals for all points
-        residuals = [values[i] - (slope * x[i] + intercept) for i in range(n)]
-        residual_std = statistics.stdev(residuals) if len(residuals) > 1 else 0.0
         
         # Anomaly if prediction error is significantly larger than typical residuals
         is_anomaly = prediction_error > 2 * residual_std if residual_std > 0 else False
@@ -221,6 +425,16 @@ class AnomalyDetectCommand(StreamingCommand):
         self.detector = AnomalyDetector(window_size=100)
         self.logger = logging.getLogger(__name__)
         self.field_list = []
+        self._active_detectors = []
+        self._score_fields = {}
+        self._ts_cache = (0.0, '')
+    
+    def _timestamp(self) -> str:
+        """ISO timestamp of the current time, refreshed at most every 50 ms."""
+        now = time.time()
+        if now - self._ts_cache[0] > 0.05:
+            self._ts_cache = (now, datetime.fromtimestamp(now).isoformat())
+        return self._ts_cache[1]
     
     def stream(self, records):
         """Process each record and detect anomalies."""
@@ -231,88 +445,92 @@ class AnomalyDetectCommand(StreamingCommand):
         # Update detector window size
         self.detector.window_size = self.window
         
-        for record in records:
-            try:
-                anomalies_detected = []
-                anomaly_scores = {}
-                anomaly_details = {}
-                
-                for field_name in self.field_list:
+        # Bind the selected detectors and their per-field window keys once,
+        # instead of comparing method names for every field of every record
+        self._active_detectors = self._select_detectors()
+        field_detectors = [
+            (field_name, [(sys.intern(f"{field_name}_{suffix}"), detect) for suffix, detect in self._active_detectors])
+            for field_name in self.field_list
+        ]
+        self._score_fields = {anomaly_key: sys.intern(f'anomaly_score_{anomaly_key}')
+                              for _, detectors in field_detectors for anomaly_key, _ in detectors}
+        
+        # Detect in blocks so the window statistics can be vectorized; records
+        # are still yielded in arrival order
+        records = iter(records)
+        for chunk in iter(lambda: list(islice(records, BATCH_SIZE)), []):
+            yield from self._process_chunk(chunk, field_detectors)
+    
+    def _process_chunk(self, chunk: List[Dict[str, Any]], field_detectors):
+        """Detect anomalies for a block of records and add the results to each record."""
+        anomalies_detected = [[] for _ in chunk]
+        anomaly_scores = [{} for _ in chunk]
+        anomaly_details = [{} for _ in chunk]
+        
+        try:
+            for field_name, detectors in field_detectors:
+                # Parse the field for the whole block, remembering which records had it
+                positions = []
+                parsed = []
+                for i, record in enumerate(chunk):
                     field_value = record.get(field_name)
                     
                     if field_value is None:
                         continue
                     
                     try:
-                        numeric_value = float(field_value)
+                        parsed.append(float(field_value))
                     except (ValueError, TypeError):
                         continue
-                    
-                    # Apply selected detection method(s)
-                    if self.method in ['zscore', 'all']:
-                        is_anomaly, score, analysis = self.detector.detect_zscore_anomaly(
-                            numeric_value, f"{field_name}_zscore", self.threshold
-                        )
-                        if is_anomaly:
-                            anomalies_detected.append(f"{field_name}_zscore")
-                            anomaly_scores[f"{field_name}_zscore"] = score
-                            if self.include_analysis:
-                                anomaly_details[f"{field_name}_zscore"] = analysis
-                    
-                    if self.method in ['iqr', 'all']:
-                        is_anomaly, score, analysis = self.detector.detect_iqr_anomaly(
-                            numeric_value, f"{field_name}_iqr", self.threshold
-                        )
-                        if is_anomaly:
-                            anomalies_detected.append(f"{field_name}_iqr")
-                            anomaly_scores[f"{field_name}_iqr"] = score
-                            if self.include_analysis:
-                                anomaly_details[f"{field_name}_iqr"] = analysis
-                    
-                    if self.method in ['isolation', 'all']:
-                        is_anomaly, score, analysis = self.detector.detect_isolation_forest_anomaly(
-                            numeric_value, f"{field_name}_isolation"
-                        )
-                        if is_anomaly:
-                            anomalies_detected.append(f"{field_name}_isolation")
-                            anomaly_scores[f"{field_name}_isolation"] = score
-                            if self.include_analysis:
-                                anomaly_details[f"{field_name}_isolation"] = analysis
-                    
-                    if self.method in ['trend', 'all']:
-                        is_anomaly, score, analysis = self.detector.detect_trend_anomaly(
-                            numeric_value, f"{field_name}_trend"
-                        )
-                        if is_anomaly:
-                            anomalies_detected.append(f"{field_name}_trend")
-                            anomaly_scores[f"{field_name}_trend"] = score
-                            if self.include_analysis:
-                                anomaly_details[f"{field_name}_trend"] = analysis
+                    positions.append(i)
+                
+                if not positions:
+                    continue
+                values = np.array(parsed, dtype=np.float64)
                 
+                # Apply selected detection method(s)
+                for anomaly_key, detect in detectors:
+                    for i, score, analysis in detect(values, anomaly_key):
+                        position = positions[i]
+                        anomalies_detected[position].append(anomaly_key)
+                        anomaly_scores[position][anomaly_key] = score
+                        if self.include_analysis:
+                            anomaly_details[position][anomaly_key] = analysis
+        except Exception as e:
+            self.logger.error(f"Error detecting anomalies: {str(e)}")
+            for record in chunk:
+                record['anomaly_detection_error'] = str(e)
+                record['anomaly_detected'] = False
+            yield from chunk
+            return
+        
+        for record, anomalies, scores, details in zip(chunk, anomalies_detected, anomaly_scores, anomaly_details):
+            try:
                 # Add anomaly detection results to record
-                record['anomaly_detected'] = len(anomalies_detected) > 0
-                record['anomaly_count'] = len(anomalies_detected)
-                record['anomaly_types'] = ','.join(anomalies_detected) if anomalies_detected else ''
+                record['anomaly_detected'] = len(anomalies) > 0
+                record['anomaly_count'] = len(anomalies)
+                record['anomaly_types'] = ','.join(anomalies) if anomalies else ''
                 
                 # Add severity based on number and scores of anomalies
-                if anomalies_detected:
-                    max_score = max(anomaly_scores.values()) if anomaly_scores else 0
-                    record['anomaly_severity'] = self._calculate_severity(len(anomalies_detected), max_score)
-                    record['max_anomaly_score'] = round(max_score, 4)
+                if anomalies:
+                    max_score = max(scores.values()) if scores else 0.0
+                    record['anomaly_severity'] = self._calculate_severity(len(anomalies), max_score)
+                    record['max_anomaly_score'] = _format_metric(max_score)
                     
                     # Add individual scores
-                    for anomaly_type, score in anomaly_scores.items():
-                        record[f'anomaly_score_{anomaly_type}'] = round(score, 4)
+                    score_fields = self._score_fields
+                    record.update({score_fields[anomaly_type]: _format_metric(score)
+                                   for anomaly_type, score in scores.items()})
                 else:
                     record['anomaly_severity'] = 'none'
-                    record['max_anomaly_score'] = 0.0
+                    record['max_anomaly_score'] = _format_metric(0.0)
                 
                 # Add detailed analysis if requested
-                if self.include_analysis and anomaly_details:
-                    record['anomaly_analysis'] = json.dumps(anomaly_details)
+                if self.include_analysis and details:
+                    record['anomaly_analysis'] = _fast_json.dumps(details)
                 
                 # Add detection metadata
-                record['anomaly_detection_time'] = datetime.now().isoformat()
+                record['anomaly_detection_time'] = self._timestamp()
                 record['anomaly_detection_method'] = self.method
                 record['anomaly_threshold'] = self.threshold
                 
@@ -323,18 +541,26 @@ class AnomalyDetectCommand(StreamingCommand):
             
             yield record
     
+    def _select_detectors(self) -> List[Tuple[str, Callable[[np.ndarray, str], List[Tuple[int, float, Dict[str, Any]]]]]]:
+        """Block detectors enabled by the method option, as (anomaly type suffix, detect) pairs."""
+        detector = self.detector
+        detectors = (
+            ('zscore', partial(detector.detect_zscore_batch, threshold=self.threshold)),
+            ('iqr', partial(detector.detect_iqr_batch, multiplier=self.threshold)),
+            ('isolation', partial(detector.detect_batch, detector.detect_isolation_forest_anomaly)),
+            ('trend', partial(detector.detect_batch, detector.detect_trend_anomaly)),
+        )
+        return [(suffix, detect) for suffix, detect in detectors if self.method in (suffix, 'all')]
+    
     def _calculate_severity(self, anomaly_count: int, max_score: float) -> str:
         """Calculate anomaly severity based on count and scores."""
         if anomaly_count == 0:
             return 'none'
-        elif anomaly_count == 1 and max_score < 3.0:
-            return 'low'
-        elif anomaly_count <= 2 and max_score < 5.0:
-            return 'medium'
-        elif anomaly_count <= 3 and max_score < 8.0:
-            return 'high'
-        else:
-            return 'critical'
+        
+        # Severity is the worse of the levels implied by the anomaly count
+        # (1 low .. 4+ critical) and by the maximum score
+        score_level = bisect_right(SEVERITY_SCORE_LIMITS, max_score) + 1
+        return SEVERITY_LABELS[max(min(anomaly_count, 4), score_level)]
 
 if __name__ == '__main__':
     dispatch(AnomalyDetectCommand, sys.argv, sys.stdin, sys.stdout, __name__)
@@ -8,23 +8,79 @@ import json
 import random
 import argparse
 import datetime
-from typing import List, Dict, Any
-import uuid
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; records are written with the standard library
+    orjson = None
+
+# Base performance characteristics per model
+MODEL_BASE_METRICS = {
+    "gpt-4-turbo": {"time": 2.1, "tokens": 145, "confidence": 0.89},
+    "gpt-3.5-turbo": {"time": 1.3, "tokens": 120, "confidence": 0.85},
+    "claude-3-sonnet": {"time": 1.8, "tokens": 160, "confidence": 0.91},
+    "claude-3-haiku": {"time": 0.9, "tokens": 95, "confidence": 0.82},
+    "llama-2-70b": {"time": 3.2, "tokens": 180, "confidence": 0.87},
+    "gemini-pro": {"time": 2.5, "tokens": 155, "confidence": 0.88}
+}
+
+MAX_TOKENS_CHOICES = [100, 200, 500, 1000]
+
+# Response rewrites used to simulate semantic drift, built once
+DRIFT_MODIFICATIONS = (
+    lambda s: s.replace("machine learning", "algorithmic processes"),
+    lambda s: s.replace("artificial intelligence", "computational systems"),
+    lambda s: s.replace("optimization", "enhancement procedures"),
+    lambda s: s.replace("analysis", "evaluation processes"),
+    lambda s: s.replace("development", "construction activities"),
+    lambda s: s + " [Note: This response may contain outdated information.]",
+    lambda s: s.replace(".", ". Additionally, consider consulting recent sources."),
+    lambda s: "Based on historical data, " + s.lower()
+)
+
+# Time series records whose random values are drawn together (also the
+# size of one worker task when generating in parallel)
+PREFILL_BLOCK_RECORDS = 8192
+
+# Time series larger than this are generated with worker processes
+PARALLEL_MIN_RECORDS = 10000
+
+def _jsonl_encoder():
+    """Return a function encoding one record as a UTF-8 JSON line."""
+    if orjson is not None:
+        # orjson emits UTF-8 bytes with the line terminator already appended
+        return partial(orjson.dumps, option=orjson.OPT_APPEND_NEWLINE)
+    return lambda record: (json.dumps(record) + '\n').encode('utf-8')
+
+def _is_drift_record(record: Dict[str, Any]) -> bool:
+    """Heuristic used for the drift count in the generation summary."""
+    return 'drift' in str(record)
 
 class LLMSampleDataGenerator:
     """Generates realistic LLM interaction data for testing."""
     
-    def __init__(self):
-        self.models = [
+    def __init__(self, seed: Optional[int] = None):
+        # Independent random streams, reproducible when a seed is given
+        self.random = random.Random(seed)
+        self.rng = np.random.default_rng(seed)
+        
+        self.models = (
             "gpt-4-turbo",
             "gpt-3.5-turbo", 
             "claude-3-sonnet",
             "claude-3-haiku",
             "llama-2-70b",
             "gemini-pro"
-        ]
+        )
         
-        self.sample_prompts = [
+        self.sample_prompts = (
             "Explain the concept of machine learning",
             "Write a Python function to calculate fibonacci numbers",
             "Summarize the latest developments in AI",
@@ -45,9 +101,9 @@ class LLMSampleDataGenerator:
             "Create a data visualization dashboard",
             "How to scale web applications?",
             "What is DevOps and its practices?"
-        ]
+        )
         
-        self.sample_responses = [
+        self.sample_responses = (
             "Machine learning is a subset of artificial intelligence that enables systems to learn and improve from experience without being explicitly programmed...",
             "Here's a Python function to calculate Fibonacci numbers: def fibonacci(n): if n <= 1: return n else: return fibonacci(n-1) + fibonacci(n-2)",
             "Recent developments in AI include advances in large language models, computer vision improvements, and breakthrough applications in healthcare...",
@@ -68,9 +124,15 @@ class LLMSampleDataGenerator:
             "An effective data visualization dashboard should focus on key metrics, use appropriate chart types, maintain visual hierarchy, and provide interactivity...",
             "Web application scaling involves horizontal scaling, load balancing, database optimization, caching strategies, and microservices architecture...",
             "DevOps is a culture and practice that emphasizes collaboration between development and operations teams to improve deployment frequency and reliability..."
-        ]
+        )
+        
+        # Per-model base metrics as parallel arrays indexed like self.models,
+        # so the time series path gathers them for a whole block at once
+        self._base_time = np.array([MODEL_BASE_METRICS[m]["time"] for m in self.models])
+        self._base_tokens = np.array([MODEL_BASE_METRICS[m]["tokens"] for m in self.models], dtype=np.float64)
+        self._base_confidence = np.array([MODEL_BASE_METRICS[m]["confidence"] for m in self.models])
         
-        self.error_messages = [
+        self.error_messages = (
             "Connection timeout",
             "API rate limit exceeded", 
             "Invalid request format",
@@ -79,64 +141,58 @@ class LLMSampleDataGenerator:
             "Resource not found",
             "Internal server error",
             "Request too large"
-        ]
+        )
     
     def generate_sample_record(self, timestamp: datetime.datetime = None, 
                              introduce_drift: bool = False,
-                             introduce_anomaly: bool = False) -> Dict[str, Any]:
-        """Generate a single sample LLM interaction record."""
+                             introduce_anomaly: bool = False,
+                             picks: Optional[Tuple[str, str, str]] = None) -> Dict[str, Any]:
+        """Generate a single sample LLM interaction record.
+        
+        picks is an optional pre-drawn (model_id, prompt, response) triple.
+        """
         
         if timestamp is None:
             timestamp = datetime.datetime.now()
         
-        model_id = random.choice(self.models)
-        prompt = random.choice(self.sample_prompts)
-        response = random.choice(self.sample_responses)
-        
-        # Base performance characteristics per model
-        base_metrics = {
-            "gpt-4-turbo": {"time": 2.1, "tokens": 145, "confidence": 0.89},
-            "gpt-3.5-turbo": {"time": 1.3, "tokens": 120, "confidence": 0.85},
-            "claude-3-sonnet": {"time": 1.8, "tokens": 160, "confidence": 0.91},
-            "claude-3-haiku": {"time": 0.9, "tokens": 95, "confidence": 0.82},
-            "llama-2-70b": {"time": 3.2, "tokens": 180, "confidence": 0.87},
-            "gemini-pro": {"time": 2.5, "tokens": 155, "confidence": 0.88}
-        }
+        if picks is None:
+            picks = self._draw_picks(1)[0]
+        model_id, prompt, response = picks
         
-        base = base_metrics[model_id]
+        base = MODEL_BASE_METRICS[model_id]
         
         # Add normal variation
-        response_time = max(0.1, base["time"] + random.gauss(0, base["time"] * 0.2))
-        token_count = max(10, int(base["tokens"] + random.gauss(0, base["tokens"] * 0.3)))
-        confidence_score = max(0.1, min(1.0, base["confidence"] + random.gauss(0, 0.1)))
+        response_time = max(0.1, base["time"] + self.random.gauss(0, base["time"] * 0.2))
+        token_count = max(10, int(base["tokens"] + self.random.gauss(0, base["tokens"] * 0.3)))
+        confidence_score = max(0.1, min(1.0, base["confidence"] + self.random.gauss(0, 0.1)))
         
         # Introduce drift if requested
         if introduce_drift:
-            response_time *= random.uniform(1.5, 3.0)  # Significant slowdown
-            confidence_score *= random.uniform(0.5, 0.8)  # Lower confidence
+            response_time *= self.random.uniform(1.5, 3.0)  # Significant slowdown
+            confidence_score *= self.random.uniform(0.5, 0.8)  # Lower confidence
             response = self._modify_response_for_drift(response)
         
         # Introduce anomalies if requested
         if introduce_anomaly:
-            if random.random() < 0.3:  # 30% chance of timeout
-                response_time = random.uniform(20, 60)
-            if random.random() < 0.2:  # 20% chance of very low confidence
-                confidence_score = random.uniform(0.1, 0.3)
-            if random.random() < 0.1:  # 10% chance of error
+            if self.random.random() < 0.3:  # 30% chance of timeout
+                response_time = self.random.uniform(20, 60)
+            if self.random.random() < 0.2:  # 20% chance of very low confidence
+                confidence_score = self.random.uniform(0.1, 0.3)
+            if self.random.random() < 0.1:  # 10% chance of error
                 return self._generate_error_record(timestamp, model_id, prompt)
         
         # Create metadata
         metadata = {
-            "temperature": round(random.uniform(0.1, 1.0), 1),
-            "max_tokens": random.choice([100, 200, 500, 1000]),
-            "top_p": round(random.uniform(0.8, 1.0), 2),
-            "frequency_penalty": round(random.uniform(0.0, 0.5), 2)
+            "temperature": round(self.random.uniform(0.1, 1.0), 1),
+            "max_tokens": self.random.choice(MAX_TOKENS_CHOICES),
+            "top_p": round(self.random.uniform(0.8, 1.0), 2),
+            "frequency_penalty": round(self.random.uniform(0.0, 0.5), 2)
         }
         
         record = {
             "timestamp": timestamp.isoformat() + "Z",
             "model_id": model_id,
-            "request_id": f"req_{uuid.uuid4().hex[:8]}",
+            "request_id": self._request_id(),
             "prompt": prompt,
             "response": response,
             "response_time": round(response_time, 3),
@@ -147,25 +203,115 @@ class LLMSampleDataGenerator:
         
         return record
     
+    def _request_id(self) -> str:
+        """Draw a request ID from the seeded random stream."""
+        return f"req_{self.random.getrandbits(32):08x}"
+    
+    def _draw_picks(self, n: int) -> List[Tuple[str, str, str]]:
+        """Draw n (model_id, prompt, response) triples in bulk."""
+        choices = self.random.choices
+        return list(zip(choices(self.models, k=n),
+                        choices(self.sample_prompts, k=n),
+                        choices(self.sample_responses, k=n)))
+    
+    def _prefill_randoms(self, n: int, interval_seconds: int) -> Dict[str, List]:
+        """Draw the random values for n time series records in bulk.
+        
+        The per-record response time, token count and confidence are computed
+        here from the gathered base metrics. Values are returned as Python lists so records hold plain floats and ints.
+        """
+        rng = self.rng
+        offset = rng.integers(0, interval_seconds, size=n)
+        model = rng.integers(0, len(self.models), size=n)
+        prompt = rng.integers(0, len(self.sample_prompts), size=n)
+        response = rng.integers(0, len(self.sample_responses), size=n)
+        max_tokens = rng.integers(0, len(MAX_TOKENS_CHOICES), size=n)
+        # Response time, token count and confidence noise for each record
+        normal = rng.standard_normal((n, 3))
+        
+        # Normal variation around each record's model base metrics
+        base_time = self._base_time[model]
+        base_tokens = self._base_tokens[model]
+        response_time = np.maximum(0.1, base_time + normal[:, 0] * base_time * 0.2)
+        token_count = np.maximum(10, (base_tokens + normal[:, 1] * base_tokens * 0.3).astype(np.int64))
+        confidence_score = np.clip(self._base_confidence[model] + normal[:, 2] * 0.1, 0.1, 1.0)
+        
+        return {
+            "offset": offset.tolist(),
+            "model": model.tolist(),
+            "prompt": prompt.tolist(),
+            "response": response.tolist(),
+            "max_tokens": max_tokens.tolist(),
+            "response_time": response_time.tolist(),
+            "token_count": token_count.tolist(),
+            "confidence_score": confidence_score.tolist(),
+            # Two per record: drift and anomaly decisions, then two drift factors
+            # and three metadata values
+            "uniform": rng.random(n * 7).tolist()
+        }
+    
+    def generate_sample_record_from_arrays(self, i: int, arrays: Dict[str, List],
+                                           timestamp: datetime.datetime,
+                                           introduce_drift: bool = False,
+                                           introduce_anomaly: bool = False) -> Dict[str, Any]:
+        """Generate the i-th record from values drawn by _prefill_randoms.
+        
+        Equivalent to generate_sample_record; the rare anomaly, drift text and
+        error paths still draw their values from self.random.
+        """
+        model_id = self.models[arrays["model"][i]]
+        prompt = self.sample_prompts[arrays["prompt"][i]]
+        response = self.sample_responses[arrays["response"][i]]
+        uniform = arrays["uniform"]
+        u = 7 * i + 2
+        
+        response_time = arrays["response_time"][i]
+        token_count = arrays["token_count"][i]
+        confidence_score = arrays["confidence_score"][i]
+        
+        # Introduce drift if requested
+        if introduce_drift:
+            response_time *= 1.5 + 1.5 * uniform[u]  # Significant slowdown
+            confidence_score *= 0.5 + 0.3 * uniform[u + 1]  # Lower confidence
+            response = self._modify_response_for_drift(response)
+        
+        # Introduce anomalies if requested
+        if introduce_anomaly:
+            if self.random.random() < 0.3:  # 30% chance of timeout
+                response_time = self.random.uniform(20, 60)
+            if self.random.random() < 0.2:  # 20% chance of very low confidence
+                confidence_score = self.random.uniform(0.1, 0.3)
+            if self.random.random() < 0.1:  # 10% chance of error
+                return self._generate_error_record(timestamp, model_id, prompt)
+        
+        # Create metadata
+        metadata = {
+            "temperature": round(0.1 + 0.9 * uniform[u + 2], 1),
+            "max_tokens": MAX_TOKENS_CHOICES[arrays["max_tokens"][i]],
+            "top_p": round(0.8 + 0.2 * uniform[u + 3], 2),
+            "frequency_penalty": round(0.5 * uniform[u + 4], 2)
+        }
+        
+        return {
+            "timestamp": timestamp.isoformat() + "Z",
+            "model_id": model_id,
+            "request_id": self._request_id(),
+            "prompt": prompt,
+            "response": response,
+            "response_time": round(response_time, 3),
+            "token_count": token_count,
+            "confidence_score": round(confidence_score, 3),
+            "metadata": metadata
+        }
+    
     def _modify_response_for_drift(self, original_response: str) -> str:
         """Modify response to simulate semantic drift."""
-        modifications = [
-            lambda s: s.replace("machine learning", "algorithmic processes"),
-            lambda s: s.replace("artificial intelligence", "computational systems"),
-            lambda s: s.replace("optimization", "enhancement procedures"),
-            lambda s: s.replace("analysis", "evaluation processes"),
-            lambda s: s.replace("development", "construction activities"),
-            lambda s: s + " [Note: This response may contain outdated information.]",
-            lambda s: s.replace(".", ". Additionally, consider consulting recent sources."),
-            lambda s: "Based on historical data, " + s.lower()
-        ]
-        
         # Apply 1-3 random modifications
-        num_mods = random.randint(1, 3)
+        num_mods = self.random.randint(1, 3)
         result = original_response
         
         for _ in range(num_mods):
-            mod = random.choice(modifications)
+            mod = self.random.choice(DRIFT_MODIFICATIONS)
             result = mod(result)
         
         return result
@@ -176,14 +322,14 @@ class LLMSampleDataGenerator:
         return {
             "timestamp": timestamp.isoformat() + "Z",
             "model_id": model_id,
-            "request_id": f"req_{uuid.uuid4().hex[:8]}",
+            "request_id": self._request_id(),
             "prompt": prompt,
             "response": "",
-            "response_time": random.uniform(0.1, 2.0),
+            "response_time": self.random.uniform(0.1, 2.0),
             "token_count": 0,
             "confidence_score": 0.0,
-            "error": random.choice(self.error_messages),
-            "metadata": {"error_code": random.randint(400, 599)}
+            "error": self.random.choice(self.error_messages),
+            "metadata": {"error_code": self.random.randint(400, 599)}
         }
     
     def generate_time_series_data(self, start_time: datetime.datetime,
@@ -191,37 +337,138 @@ class LLMSampleDataGenerator:
                                 interval_minutes: int = 1,
                                 records_per_interval: int = 5,
                                 drift_probability: float = 0.05,
-                                anomaly_probability: float = 0.02) -> List[Dict[str, Any]]:
-        """Generate time series data with drift and anomalies."""
+                                anomaly_probability: float = 0.02) -> Iterator[Dict[str, Any]]:
+        """Generate time series data with drift and anomalies, yielding records in time order."""
         
-        records = []
+        interval = datetime.timedelta(minutes=interval_minutes)
+        intervals_per_block = max(1, PREFILL_BLOCK_RECORDS // max(records_per_interval, 1))
         current_time = start_time
         
         while current_time < end_time:
-            for _ in range(records_per_interval):
-                # Add some randomness to timestamps within the interval
-                record_time = current_time + datetime.timedelta(
-                    seconds=random.randint(0, interval_minutes * 60 - 1)
-                )
-                
-                introduce_drift = random.random() < drift_probability
-                introduce_anomaly = random.random() < anomaly_probability
-                
-                record = self.generate_sample_record(
-                    record_time, introduce_drift, introduce_anomaly
-                )
-                records.append(record)
+            # Draw the random values for a block of intervals at a time, so
+            # memory stays bounded however long the series is
+            interval_starts = []
+            while current_time < end_time and len(interval_starts) < intervals_per_block:
+                interval_starts.append(current_time)
+                current_time += interval
             
-            current_time += datetime.timedelta(minutes=interval_minutes)
-        
-        return records
+            arrays = self._prefill_randoms(len(interval_starts) * records_per_interval, interval_minutes * 60)
+            offsets = arrays["offset"]
+            uniform = arrays["uniform"]
+            
+            i = 0
+            for interval_start in interval_starts:
+                for _ in range(records_per_interval):
+                    # Add some randomness to timestamps within the interval
+                    record_time = interval_start + datetime.timedelta(seconds=offsets[i])
+                    
+                    introduce_drift = uniform[7 * i] < drift_probability
+                    introduce_anomaly = uniform[7 * i + 1] < anomaly_probability
+                    
+                    yield self.generate_sample_record_from_arrays(
+                        i, arrays, record_time, introduce_drift, introduce_anomaly
+                    )
+                    i += 1
+    
+    def generate_recent_data(self, count: int, drift_probability: float = 0.05,
+                             anomaly_probability: float = 0.02) -> Iterator[Dict[str, Any]]:
+        """Generate count records spread over the last hour."""
+        for picks in self._draw_picks(count):
+            # Distribute records over the last hour
+            timestamp = datetime.datetime.now() - datetime.timedelta(
+                minutes=self.random.randint(0, 60)
+            )
+            
+            introduce_drift = self.random.random() < drift_probability
+            introduce_anomaly = self.random.random() < anomaly_probability
+            
+            yield self.generate_sample_record(
+                timestamp, introduce_drift, introduce_anomaly, picks
+            )
     
-    def save_to_file(self, records: List[Dict[str, Any]], filename: str):
-        """Save records to a JSON file."""
-        with open(filename, 'w') as f:
+    def save_to_file(self, records: Iterable[Dict[str, Any]], filename: str) -> int:
+        """Save records to a JSON Lines file as they are produced; returns the record count."""
+        encode = _jsonl_encoder()
+        count = 0
+        with open(filename, 'wb', buffering=1 << 20) as f:
             for record in records:
-                f.write(json.dumps(record) + '\n')
-        print(f"Generated {len(records)} records and saved to {filename}")
+                f.write(encode(record))
+                count += 1
+        print(f"Generated {count} records and saved to {filename}")
+        return count
+
+def _generate_time_range(task: Tuple) -> Tuple[bytes, int, int, int]:
+    """Worker: generate one time range as JSON lines; returns (lines, records, drift, errors)."""
+    seed, start_time, end_time, interval_minutes, records_per_interval, drift_probability, anomaly_probability = task
+    generator = LLMSampleDataGenerator(seed=seed)
+    encode = _jsonl_encoder()
+    
+    lines = []
+    drift_count = 0
+    error_count = 0
+    for record in generator.generate_time_series_data(start_time, end_time, interval_minutes,
+                                                      records_per_interval, drift_probability,
+                                                      anomaly_probability):
+        lines.append(encode(record))
+        drift_count += _is_drift_record(record)
+        error_count += 'error' in record
+    
+    return b''.join(lines), len(lines), drift_count, error_count
+
+def _ordered_results(tasks: List[Tuple], workers: int) -> Iterator[Tuple[bytes, int, int, int]]:
+    """Generate the time ranges of tasks, in worker processes when workers > 1, yielding results in order."""
+    if workers <= 1:
+        yield from map(_generate_time_range, tasks)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded number of ranges in flight
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_generate_time_range, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def save_time_series(filename: str, start_time: datetime.datetime, end_time: datetime.datetime,
+                     interval_minutes: int, records_per_interval: int,
+                     drift_probability: float, anomaly_probability: float,
+                     workers: int = 1, seed: Optional[int] = None) -> Tuple[int, int, int]:
+    """Generate a time series and write it in time order.
+    
+    The series is split into contiguous ranges of whole intervals, each
+    generated with random streams seeded from seed and the range index, so a
+    seed gives the same records however many workers are used. Returns the
+    record, drift and error counts.
+    """
+    interval = datetime.timedelta(minutes=interval_minutes)
+    n_intervals, remainder = divmod(max(end_time - start_time, datetime.timedelta(0)), interval)
+    n_intervals += 1 if remainder else 0
+    intervals_per_task = max(1, PREFILL_BLOCK_RECORDS // max(records_per_interval, 1))
+    
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (1 << 32))
+    
+    tasks = []
+    for task_id, first in enumerate(range(0, n_intervals, intervals_per_task)):
+        range_start = start_time + first * interval
+        range_end = min(end_time, range_start + intervals_per_task * interval)
+        # Mix the range index into the seed so ranges of nearby seeds do not coincide
+        task_seed = int(np.random.SeedSequence([seed, task_id]).generate_state(1)[0])
+        tasks.append((task_seed, range_start, range_end, interval_minutes,
+                      records_per_interval, drift_probability, anomaly_probability))
+    
+    total = drift_total = error_total = 0
+    with open(filename, 'wb', buffering=1 << 20) as f:
+        for lines, count, drift_count, error_count in _ordered_results(tasks, workers):
+            f.write(lines)
+            total += count
+            drift_total += drift_count
+            error_total += error_count
+    
+    print(f"Generated {total} records and saved to {filename}")
+    return total, drift_total, error_total
 
 def main():
     parser = argparse.ArgumentParser(description='Generate sample LLM data for testing')
@@ -237,49 +484,55 @@ def main():
                        help='Probability of drift in each record (0.0-1.0)')
     parser.add_argument('--anomaly-rate', type=float, default=0.02,
                        help='Probability of anomalies in each record (0.0-1.0)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help='Worker processes for large time series (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for reproducible records (timestamps still follow the current time)')
     
     args = parser.parse_args()
     
-    generator = LLMSampleDataGenerator()
-    
     if args.time_series:
         end_time = datetime.datetime.now()
         start_time = end_time - datetime.timedelta(hours=args.hours)
         
-        records = generator.generate_time_series_data(
-            start_time=start_time,
-            end_time=end_time,
-            interval_minutes=5,  # One record every 5 minutes
-            records_per_interval=3,  # 3 records per interval
-            drift_probability=args.drift_rate,
-            anomaly_probability=args.anomaly_rate
+        # One record every 5 minutes, 3 records per interval; small series
+        # are not worth starting worker processes for
+        n_records = args.hours * 60 // 5 * 3
+        workers = args.workers if n_records > PARALLEL_MIN_RECORDS else 1
+        total, drift_total, error_total = save_time_series(
+            args.output, start_time, end_time, 5, 3,
+            args.drift_rate, args.anomaly_rate, workers, args.seed
         )
-    else:
-        records = []
-        for i in range(args.count):
-            # Distribute records over the last hour
-            timestamp = datetime.datetime.now() - datetime.timedelta(
-                minutes=random.randint(0, 60)
-            )
-            
-            introduce_drift = random.random() < args.drift_rate
-            introduce_anomaly = random.random() < args.anomaly_rate
-            
-            record = generator.generate_sample_record(
-                timestamp, introduce_drift, introduce_anomaly
-            )
-            records.append(record)
+        _print_summary(args.output, total, drift_total, error_total)
+        return
+    
+    generator = LLMSampleDataGenerator(seed=args.seed)
+    records = generator.generate_recent_data(args.count, args.drift_rate, args.anomaly_rate)
     
-    generator.save_to_file(records, args.output)
+    # Tally the summary counts while records stream to the file
+    tally = {"drift": 0, "error": 0}
     
+    def counted(records):
+        for record in records:
+            if _is_drift_record(record):
+                tally["drift"] += 1
+            if 'error' in record:
+                tally["error"] += 1
+            yield record
+    
+    total = generator.save_to_file(counted(records), args.output)
+    _print_summary(args.output, total, tally["drift"], tally["error"])
+
+def _print_summary(output: str, total: int, drift_total: int, error_total: int):
+    """Print the generation summary and ingestion hints."""
     print(f"Sample data generation completed:")
-    print(f"  Total records: {len(records)}")
-    print(f"  Drift records: {sum(1 for r in records if 'drift' in str(r))}")
-    print(f"  Error records: {sum(1 for r in records if 'error' in r)}")
-    print(f"  Output file: {args.output}")
+    print(f"  Total records: {total}")
+    print(f"  Drift records: {drift_total}")
+    print(f"  Error records: {error_total}")
+    print(f"  Output file: {output}")
     print(f"\nTo ingest into Splunk:")
     print(f"  1. Copy file to Splunk server")
-    print(f"  2. Use: index=llm_logs sourcetype=llm_logs {args.output}")
+    print(f"  2. Use: index=llm_logs sourcetype=llm_logs {output}")
 
 if __name__ == "__main__":
     main()
@@ -12,47 +12,135 @@ import logging
 import hashlib
 import re
 from collections import Counter
+from functools import lru_cache
 
 # Splunk SDK imports
 sys.path.insert(0, '/opt/splunk/lib/python3.9/site-packages')
 from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
 
+# The feature kernel module imports numba when it is installed, which costs
+# more than a short search saves, so it is loaded on the first encode
+_core = None
+
+def _feature_kernel():
+    """Import the text feature kernel module on first use."""
+    global _core
+    if _core is None:
+        import _semantic_core
+        _core = _semantic_core
+    return _core
+
+# Keyword lists for the sentiment and topic features (matched as substrings)
+POSITIVE_WORDS = ('good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic')
+NEGATIVE_WORDS = ('bad', 'terrible', 'awful', 'horrible', 'disappointing', 'poor')
+TECH_WORDS = ('algorithm', 'data', 'model', 'system', 'code', 'software')
+BUSINESS_WORDS = ('revenue', 'profit', 'customer', 'market', 'strategy', 'business')
+TOPIC_WORDS = (POSITIVE_WORDS, NEGATIVE_WORDS, TECH_WORDS, BUSINESS_WORDS)
+
+# Text normalization patterns, compiled once
+WHITESPACE_RE = re.compile(r'\s+')
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\!\?\;\:]')
+
+# Distinct texts whose embeddings semanticcompare keeps for reuse
+ENCODE_CACHE_SIZE = 4096
+
+def _cosine_similarity(emb1: np.ndarray, emb2: np.ndarray) -> float:
+    """Dot product of two normalized embeddings."""
+    return float(np.dot(emb1, emb2))
+
+def _euclidean_similarity(emb1: np.ndarray, emb2: np.ndarray) -> float:
+    """Similarity from the Euclidean distance, in (0, 1]."""
+    return float(1.0 / (1.0 + np.linalg.norm(emb1 - emb2)))
+
+def _manhattan_similarity(emb1: np.ndarray, emb2: np.ndarray) -> float:
+    """Similarity from the Manhattan distance, in (0, 1]."""
+    return float(1.0 / (1.0 + np.sum(np.abs(emb1 - emb2))))
+
+SIMILARITY_FUNCTIONS = {
+    'cosine': _cosine_similarity,
+    'euclidean': _euclidean_similarity,
+    'manhattan': _manhattan_similarity
+}
+
 class SemanticAnalyzer:
     """Semantic analysis utilities for text comparison."""
     
     def __init__(self):
         self.dim = 384
+        # Per-analyzer memo of embeddings for texts that repeat across records
+        self.encode_cached = lru_cache(maxsize=ENCODE_CACHE_SIZE)(self._encode_readonly)
         
     def encode_text(self, text: str) -> np.ndarray:
         """Generate semantic embedding for text."""
+        return self.encode_text_into(text, np.empty(self.dim, dtype=np.float32))
+    
+    def encode_text_into(self, text: str, out: np.ndarray) -> np.ndarray:
+        """Write the semantic embedding of text into out (float32, length dim) and return it."""
         # Preprocess text
         text = self._preprocess_text(text)
         
         # Simple embedding based on character n-grams and word patterns
-        features = []
-        
-        # Character-level features
-        char_features = self._get_character_features(text)
-        features.extend(char_features)
-        
-        # Word-level features  
-        word_features = self._get_word_features(text)
-        features.extend(word_features)
-        
-        # Semantic features
-        semantic_features = self._get_semantic_features(text)
-        features.extend(semantic_features)
-        
-        # Convert to numpy array and normalize
-        vec = np.array(features[:self.dim], dtype=np.float32)
-        if len(vec) < self.dim:
-            vec = np.pad(vec, (0, self.dim - len(vec)), 'constant')
+        if _feature_kernel().HAVE_NUMBA:
+            features = self._get_compiled_features(text)
+        else:
+            features = []
+            # Split once and share the words between the extractors
+            words = text.split()
+            
+            # Character-level features
+            char_features = self._get_character_features(text, words)
+            features.extend(char_features)
+            
+            # Word-level features  
+            word_features = self._get_word_features(text, words)
+            features.extend(word_features)
+            
+            # Semantic features
+            semantic_features = self._get_semantic_features(text, words)
+            features.extend(semantic_features)
+        
+        # Copy into the zero-padded output vector and normalize in place
+        n = min(len(features), self.dim)
+        out[:n] = features[:n]
+        out[n:] = 0.0
             
         # Normalize
-        norm = np.linalg.norm(vec)
+        norm = np.linalg.norm(out)
         if norm > 0:
-            vec = vec / norm
+            out /= norm
             
+        return out
+    
+    def encode_text_fast(self, text: str) -> np.ndarray:
+        """Generate a hash-based embedding for text.
+        
+        The digest of the preprocessed text is expanded into dim bytes, each
+        mapped to a centered float component. Much cheaper than encode_text on
+        long texts but only identical texts score as similar.
+        """
+        return self.encode_text_fast_into(text, np.empty(self.dim, dtype=np.float32))
+    
+    def encode_text_fast_into(self, text: str, out: np.ndarray) -> np.ndarray:
+        """Write the hash-based embedding of text into out (float32, length dim) and return it."""
+        seed = hashlib.blake2b(self._preprocess_text(text).encode('utf-8'), digest_size=64).digest()
+        n_blocks = -(-self.dim // 64)
+        stream = b''.join(hashlib.blake2b(seed + i.to_bytes(2, 'little'), digest_size=64).digest()
+                          for i in range(n_blocks))
+        
+        out[:] = np.frombuffer(stream, dtype=np.uint8, count=self.dim)
+        out *= 1.0 / 255.0
+        out -= 0.5
+        
+        norm = np.linalg.norm(out)
+        if norm > 0:
+            out /= norm
+        
+        return out
+    
+    def _encode_readonly(self, text: str) -> np.ndarray:
+        """Encode text into a read-only embedding, safe to share from the cache."""
+        vec = self.encode_text(text)
+        vec.setflags(write=False)
         return vec
     
     def _preprocess_text(self, text: str) -> str:
@@ -61,38 +149,53 @@ class SemanticAnalyzer:
         text = text.lower()
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = WHITESPACE_RE.sub(' ', text)
         
         # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s\.\,\!\?\;\:]', '', text)
+        text = SPECIAL_CHARS_RE.sub('', text)
         
         return text.strip()
     
-    def _get_character_features(self, text: str) -> List[float]:
-        """Extract character-level features."""
-        features = []
+    def _get_compiled_features(self, text: str) -> np.ndarray:
+        """Extract character, word and semantic features in one compiled pass."""
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        
+        # Lowercased ASCII text has no uppercase characters left
+        n_upper = 0 if text.isascii() else sum(1 for c in text if c.isupper())
+        topic_counts = np.array([sum(1 for word in words if word in text) for words in TOPIC_WORDS],
+                                dtype=np.int64)
         
-        # Character frequency distribution
-        char_counts = Counter(text)
+        return _feature_kernel().text_features(codes, len(set(text.split())), n_upper, topic_counts)
+    
+    def _get_character_features(self, text: str, words: Optional[List[str]] = None) -> List[float]:
+        """Extract character-level features (words is text.split(), when already known)."""
+        if words is None:
+            words = text.split()
+        
+        # Character frequency distribution: a-z counts from one bincount over
+        # the ASCII bytes (other characters only count towards the total)
         total_chars = len(text)
+        codes = np.frombuffer(text.encode('ascii', 'ignore'), dtype=np.uint8)
+        char_counts = np.bincount(codes, minlength=128)[ord('a'):ord('z') + 1]
+        freqs = char_counts / max(total_chars, 1)
         
-        # Top 50 most common characters
-        for i in range(50):
-            char = chr(ord('a') + i % 26)  # a-z cycling
-            freq = char_counts.get(char, 0) / max(total_chars, 1)
-            features.append(freq)
+        # 50 frequency features, cycling through a-z
+        features = np.tile(freqs, 2)[:50].tolist()
         
         # Text statistics
         features.append(len(text) / 1000.0)  # Normalized length
-        features.append(len(text.split()) / max(len(text), 1))  # Word density
-        features.append(sum(1 for c in text if c.isupper()) / max(len(text), 1))  # Uppercase ratio
+        features.append(len(words) / max(len(text), 1))  # Word density
+        # Lowercased ASCII text has no uppercase characters left
+        n_upper = 0 if text.isascii() else sum(1 for c in text if c.isupper())
+        features.append(n_upper / max(len(text), 1))  # Uppercase ratio
         
         return features
     
-    def _get_word_features(self, text: str) -> List[float]:
-        """Extract word-level features."""
+    def _get_word_features(self, text: str, words: Optional[List[str]] = None) -> List[float]:
+        """Extract word-level features (words is text.split(), when already known)."""
         features = []
-        words = text.split()
+        if words is None:
+            words = text.split()
         
         # Word length statistics
         if words:
@@ -104,62 +207,51 @@ class SemanticAnalyzer:
             features.extend([0.0, 0.0, 0.0])
         
         # Common word patterns
-        common_words = ['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of']
-        for word in common_words:
-            count = sum(1 for w in words if w == word)
-            features.append(count / max(len(words), 1))
+        word_counts = Counter(words)
+        n_words = max(len(words), 1)
+        features.extend(word_counts[word] / n_words for word in _feature_kernel().COMMON_WORDS)
         
         return features
     
-    def _get_semantic_features(self, text: str) -> List[float]:
-        """Extract semantic-level features."""
+    def _get_semantic_features(self, text: str, words: Optional[List[str]] = None) -> List[float]:
+        """Extract semantic-level features (words is text.split(), when already known)."""
         features = []
+        if words is None:
+            words = text.split()
         
-        # Sentence structure
-        sentences = text.split('.')
-        features.append(len(sentences) / max(len(text), 1))  # Sentence density
-        
-        # Question/answer patterns
-        features.append(text.count('?') / max(len(text), 1))
-        features.append(text.count('!') / max(len(text), 1))
-        
-        # Sentiment indicators (simple)
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic']
-        negative_words = ['bad', 'terrible', 'awful', 'horrible', 'disappointing', 'poor']
+        n_chars = max(len(text), 1)
+        n_words = max(len(words), 1)
         
-        pos_count = sum(1 for word in positive_words if word in text)
-        neg_count = sum(1 for word in negative_words if word in text)
+        # Sentence structure (the number of '.'-separated pieces, without splitting)
+        features.append((text.count('.') + 1) / n_chars)  # Sentence density
         
-        features.append(pos_count / max(len(text.split()), 1))
-        features.append(neg_count / max(len(text.split()), 1))
-        
-        # Topic indicators (simple)
-        tech_words = ['algorithm', 'data', 'model', 'system', 'code', 'software']
-        business_words = ['revenue', 'profit', 'customer', 'market', 'strategy', 'business']
-        
-        tech_count = sum(1 for word in tech_words if word in text)
-        business_count = sum(1 for word in business_words if word in text)
+        # Question/answer patterns
+        features.append(text.count('?') / n_chars)
+        features.append(text.count('!') / n_chars)
         
-        features.append(tech_count / max(len(text.split()), 1))
-        features.append(business_count / max(len(text.split()), 1))
+        # Sentiment and topic indicators (simple)
+        for topic_words in TOPIC_WORDS:
+            count = sum(1 for word in topic_words if word in text)
+            features.append(count / n_words)
         
         return features
     
     def calculate_similarity(self, emb1: np.ndarray, emb2: np.ndarray, method: str = 'cosine') -> float:
         """Calculate similarity between embeddings."""
-        if method == 'cosine':
-            return float(np.dot(emb1, emb2))
-        elif method == 'euclidean':
-            return float(1.0 / (1.0 + np.linalg.norm(emb1 - emb2)))
-        elif method == 'manhattan':
-            return float(1.0 / (1.0 + np.sum(np.abs(emb1 - emb2))))
-        else:
-            return float(np.dot(emb1, emb2))  # Default to cosine
+        return self.similarity_function(method)(emb1, emb2)
+    
+    def similarity_function(self, method: str):
+        """Resolve a similarity method name to its function (unknown names use cosine)."""
+        return SIMILARITY_FUNCTIONS.get(method, _cosine_similarity)
     
-    def analyze_semantic_shift(self, text1: str, text2: str) -> Dict[str, Any]:
-        """Analyze semantic shift between two texts."""
-        emb1 = self.encode_text(text1)
-        emb2 = self.encode_text(text2)
+    def analyze_semantic_shift(self, text1: str, text2: str,
+                               emb1: Optional[np.ndarray] = None,
+                               emb2: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Analyze semantic shift between two texts, reusing their embeddings when given."""
+        if emb1 is None:
+            emb1 = self.encode_text(text1)
+        if emb2 is None:
+            emb2 = self.encode_text(text2)
         
         similarity = self.calculate_similarity(emb1, emb2)
         
@@ -184,10 +276,11 @@ class SemanticAnalyzer:
         if not words1 and not words2:
             return 1.0
         
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
+        # The union size follows from the intersection, so no union set is built
+        intersection = len(words1 & words2)
+        union = len(words1) + len(words2) - intersection
         
-        return len(intersection) / len(union) if union else 0.0
+        return intersection / union if union else 0.0
 
 @Configuration()
 class SemanticCompareCommand(StreamingCommand):
@@ -216,6 +309,13 @@ class SemanticCompareCommand(StreamingCommand):
         default='cosine'
     )
     
+    fast_hash = Option(
+        doc='Use hash-based embeddings (faster, only identical texts score as similar)',
+        require=False,
+        default=False,
+        validate=validators.Boolean()
+    )
+    
     include_analysis = Option(
         doc='Include detailed semantic analysis',
         require=False,
@@ -230,6 +330,18 @@ class SemanticCompareCommand(StreamingCommand):
     
     def stream(self, records):
         """Process each record and add semantic comparison fields."""
+        # Resolve the similarity method once for the whole stream
+        similarity_fn = self.analyzer.similarity_function(self.method)
+        if self.fast_hash:
+            # Hash embeddings are cheap to recompute, so write every record's
+            # pair into the same two buffers instead of caching them
+            emb_buffers = (np.empty(self.analyzer.dim, dtype=np.float32),
+                           np.empty(self.analyzer.dim, dtype=np.float32))
+            encode_pair = lambda t1, t2: (self.analyzer.encode_text_fast_into(t1, emb_buffers[0]),
+                                          self.analyzer.encode_text_fast_into(t2, emb_buffers[1]))
+        else:
+            # Repeated texts reuse their cached embeddings
+            encode_pair = lambda t1, t2: (self.analyzer.encode_cached(t1), self.analyzer.encode_cached(t2))
         
         for record in records:
             try:
@@ -244,11 +356,10 @@ class SemanticCompareCommand(StreamingCommand):
                     continue
                 
                 # Generate embeddings
-                emb1 = self.analyzer.encode_text(text1)
-                emb2 = self.analyzer.encode_text(text2)
+                emb1, emb2 = encode_pair(text1, text2)
                 
                 # Calculate similarity
-                similarity = self.analyzer.calculate_similarity(emb1, emb2, self.method)
+                similarity = similarity_fn(emb1, emb2)
                 
                 # Add basic similarity fields
                 record['similarity_score'] = round(similarity, 4)
@@ -257,7 +368,7 @@ class SemanticCompareCommand(StreamingCommand):
                 
                 # Add detailed analysis if requested
                 if self.include_analysis:
-                    analysis = self.analyzer.analyze_semantic_shift(text1, text2)
+                    analysis = self.analyzer.analyze_semantic_shift(text1, text2, emb1, emb2)
                     
                     record['semantic_shift'] = round(analysis['semantic_shift'], 4)
                     record['word_overlap'] = round(analysis['word_overlap'], 4)
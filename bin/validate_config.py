@@ -7,55 +7,220 @@ Validates the installation and configuration of the LLM DriftGuard Splunk app
 import os
 import sys
 import json
+import re
 import csv
+import configparser
+import io
+import posixpath
+import time
+import struct
+import hashlib
 import argparse
+import compileall
+import contextlib
+import importlib.util
 import subprocess
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    # lxml is optional; dashboards then only get the root element check
+    lxml_etree = None
+
+# Paths the app must contain, relative to its home directory
+REQUIRED_DIRS = (
+    "bin",
+    "default", 
+    "static",
+    "lookups",
+    "metadata",
+    "default/data/ui/views",
+    "default/data/ui/nav"
+)
+
+REQUIRED_CONF_FILES = (
+    "default/app.conf",
+    "default/commands.conf",
+    "default/props.conf",
+    "default/savedsearches.conf",
+    "metadata/default.meta"
+)
+
+REQUIRED_SCRIPTS = (
+    "bin/drift_detector.py",
+    "bin/semantic_analyzer.py", 
+    "bin/llm_metrics_collector.py",
+    "bin/model_monitor.py",
+    "bin/alert_handler.py"
+)
+
+# Lookup tables and the columns each must have
+REQUIRED_LOOKUPS = {
+    "lookups/model_baselines.csv": frozenset({"model_id", "avg_response_time", "avg_confidence"}),
+    "lookups/semantic_categories.csv": frozenset({"prompt_type", "category", "description"}),
+    "lookups/alert_thresholds.csv": frozenset({"metric_name", "warning_threshold", "critical_threshold"})
+}
+
+REQUIRED_DASHBOARDS = (
+    "default/data/ui/views/overview_dashboard.xml",
+    "default/data/ui/views/semantic_drift_analysis.xml", 
+    "default/data/ui/views/model_performance_tracking.xml",
+    "default/data/ui/views/anomaly_detection.xml",
+    "default/data/ui/views/alert_management.xml"
+)
+
+ALL_REQUIRED_PATHS = (REQUIRED_DIRS + REQUIRED_CONF_FILES + REQUIRED_SCRIPTS +
+                      tuple(REQUIRED_LOOKUPS) + REQUIRED_DASHBOARDS)
+
+# Mode bits of which any marks a script executable
+EXECUTABLE_BITS = 0o111
+
+# Threads used to scan app directories; scans are I/O-bound, which matters
+# on network-mounted Splunk homes where each one is a round trip
+SCAN_WORKERS = 16
+
+def _scan_dir(path: Path) -> Dict[str, os.DirEntry]:
+    """List a directory's entries by name; a missing directory has none."""
+    try:
+        with os.scandir(path) as it:
+            # Broken symlinks do not count as existing, as with Path.exists()
+            return {entry.name: entry for entry in it
+                    if not entry.is_symlink() or os.path.exists(entry.path)}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+def _scan_app_tree(app_home: Path, rel_paths) -> Dict[str, os.DirEntry]:
+    """Map each existing path among rel_paths (POSIX, relative to app_home) to its DirEntry.
+    
+    Only the parent directories of rel_paths are listed, once each and
+    concurrently, instead of stating every path.
+    """
+    parents = sorted({posixpath.dirname(rel_path) for rel_path in rel_paths})
+    dirs = [app_home / parent for parent in parents]
+    try:
+        with ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(dirs))) as executor:
+            listings = list(executor.map(_scan_dir, dirs))
+    except Exception:
+        # Fall back to scanning serially
+        listings = [_scan_dir(path) for path in dirs]
+    
+    wanted = set(rel_paths)
+    present = {}
+    for parent, entries in zip(parents, listings):
+        for name, entry in entries.items():
+            rel_path = posixpath.join(parent, name)
+            if rel_path in wanted:
+                present[rel_path] = entry
+    
+    return present
+
+def _literals_re(literals) -> re.Pattern:
+    """Compile a pattern matching any of the literal strings."""
+    return re.compile('|'.join(map(re.escape, literals)))
+
+def _missing_literals(content: str, literals: Tuple[str, ...], pattern: re.Pattern) -> List[str]:
+    """Return the literals (in order) that pattern, built by _literals_re, never matches in content."""
+    found = set(pattern.findall(content))
+    return [literal for literal in literals if literal not in found]
+
+# Sections and command stanzas that must appear in the app's conf files;
+# the patterns find them as text, in a single pass, when a file cannot be
+# parsed as INI
+REQUIRED_APP_SECTIONS = ("[install]", "[ui]", "[launcher]")
+APP_SECTIONS_RE = _literals_re(REQUIRED_APP_SECTIONS)
+REQUIRED_COMMANDS = ("[driftdetect]", "[semanticcompare]", "[llmmetrics]")
+COMMANDS_RE = _literals_re(REQUIRED_COMMANDS)
+
+# Import names of packages whose distribution name differs
+PACKAGE_MODULES = {"scikit-learn": "sklearn"}
+
+def _package_available(package: str) -> bool:
+    """Check whether a package can be imported, without importing it."""
+    module = PACKAGE_MODULES.get(package, package.replace('-', '_'))
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+# Root elements of Simple XML dashboards
+DASHBOARD_ROOT_TAGS = ("form", "dashboard")
+
+# XML Schema of the dashboard layout, used when lxml is installed
+DASHBOARD_SCHEMA = Path(__file__).resolve().parent.parent / "schemas" / "splunk_dashboard.xsd"
+
+# File check results are reused for at most this many seconds
+VALIDATION_CACHE_MAX_AGE = 24 * 3600
+
+def _validation_cache_path() -> Path:
+    """Location of the cached file check results."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(cache_home) / "llm_driftguard" / "validation.json"
+
+# Prefixes of logged messages, by severity
+ERROR_PREFIX = "❌ ERROR: "
+WARNING_PREFIX = "⚠️  WARNING: "
+INFO_PREFIX = "ℹ️  INFO: "
+
+def _indented_lines(messages: List[str]) -> str:
+    """Join messages into indented output lines."""
+    return "".join(f"  {message}\n" for message in messages)
 
 class ConfigValidator:
     """Validates LLM DriftGuard app configuration."""
     
-    def __init__(self, splunk_home: str = "/opt/splunk"):
+    def __init__(self, splunk_home: str = "/opt/splunk", verbose: bool = False,
+                 write_bytecode: bool = False, use_cache: bool = False, fast_fail: bool = False):
         self.splunk_home = Path(splunk_home)
+        self.verbose = verbose
+        self.write_bytecode = write_bytecode
+        self.use_cache = use_cache
+        self.fast_fail = fast_fail
         self.app_home = self.splunk_home / "etc" / "apps" / "llm_driftguard"
         self.errors = []
         self.warnings = []
         self.info = []
+        # Required paths present in the app, scanned on first use
+        self._present = None
+        # Stanzas of the conf files parsed so far
+        self._conf_stanzas_cache = {}
+        # Compiled dashboard schema, loaded on first use
+        self._dashboard_schema = None
+        self._dashboard_schema_loaded = False
         
     def log_error(self, message: str):
         """Log an error message."""
-        self.errors.append(f"❌ ERROR: {message}")
+        self.errors.append(ERROR_PREFIX + message)
         
     def log_warning(self, message: str):
         """Log a warning message."""
-        self.warnings.append(f"⚠️  WARNING: {message}")
+        self.warnings.append(WARNING_PREFIX + message)
         
     def log_info(self, message: str):
         """Log an info message."""
-        self.info.append(f"ℹ️  INFO: {message}")
+        self.info.append(INFO_PREFIX + message)
         
+    def _entry(self, rel_path: str) -> Optional[os.DirEntry]:
+        """Return the directory entry for a required app path, or None if it is missing."""
+        if self._present is None:
+            self._present = _scan_app_tree(self.app_home, ALL_REQUIRED_PATHS)
+        return self._present.get(rel_path)
+    
     def validate_directory_structure(self) -> bool:
         """Validate that required directories exist."""
         self.log_info("Validating directory structure...")
         
-        required_dirs = [
-            "bin",
-            "default", 
-            "static",
-            "lookups",
-            "metadata",
-            "default/data/ui/views",
-            "default/data/ui/nav"
-        ]
-        
         success = True
-        for dir_path in required_dirs:
+        for dir_path in REQUIRED_DIRS:
             full_path = self.app_home / dir_path
-            if not full_path.exists():
+            entry = self._entry(dir_path)
+            if entry is None:
                 self.log_error(f"Required directory missing: {full_path}")
                 success = False
-            elif not full_path.is_dir():
+            elif not entry.is_dir():
                 self.log_error(f"Path exists but is not a directory: {full_path}")
                 success = False
                 
@@ -68,7 +233,7 @@ class ConfigValidator:
         """Validate that required configuration files exist and are valid."""
         self.log_info("Validating configuration files...")
         
-        required_files = {
+        validators = {
             "default/app.conf": self._validate_app_conf,
             "default/commands.conf": self._validate_commands_conf,
             "default/props.conf": self._validate_props_conf,
@@ -77,12 +242,14 @@ class ConfigValidator:
         }
         
         success = True
-        for file_path, validator in required_files.items():
+        for file_path in REQUIRED_CONF_FILES:
+            validator = validators.get(file_path)
             full_path = self.app_home / file_path
-            if not full_path.exists():
+            entry = self._entry(file_path)
+            if entry is None:
                 self.log_error(f"Required configuration file missing: {full_path}")
                 success = False
-            elif not full_path.is_file():
+            elif not entry.is_file():
                 self.log_error(f"Path exists but is not a file: {full_path}")
                 success = False
             else:
@@ -99,37 +266,36 @@ class ConfigValidator:
         """Validate Python scripts are executable and have correct syntax."""
         self.log_info("Validating Python scripts...")
         
-        required_scripts = [
-            "bin/drift_detector.py",
-            "bin/semantic_analyzer.py", 
-            "bin/llm_metrics_collector.py",
-            "bin/model_monitor.py",
-            "bin/alert_handler.py"
-        ]
-        
         success = True
-        for script_path in required_scripts:
+        for script_path in REQUIRED_SCRIPTS:
             full_path = self.app_home / script_path
             
-            if not full_path.exists():
+            entry = self._entry(script_path)
+            if entry is None:
                 self.log_error(f"Required Python script missing: {full_path}")
                 success = False
                 continue
                 
-            # Check if executable
-            if not os.access(full_path, os.X_OK):
+            # Check if executable, from the mode bits of the scanned entry's
+            # (cached) stat rather than another access() syscall
+            if not entry.stat().st_mode & EXECUTABLE_BITS:
                 self.log_warning(f"Python script not executable: {full_path}")
                 
-            # Check syntax
+            # Check syntax in-process
             try:
-                result = subprocess.run([
-                    sys.executable, "-m", "py_compile", str(full_path)
-                ], capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    self.log_error(f"Python syntax error in {script_path}: {result.stderr}")
-                    success = False
-                    
+                if self.write_bytecode:
+                    # Also compile the script's .pyc, ready for Splunk's first run
+                    output = io.StringIO()
+                    with contextlib.redirect_stdout(output):
+                        compiled = compileall.compile_file(str(full_path), quiet=1, force=True)
+                    if not compiled:
+                        self.log_error(f"Python syntax error in {script_path}: {output.getvalue().strip()}")
+                        success = False
+                else:
+                    compile(full_path.read_bytes(), str(full_path), 'exec')
+            except SyntaxError as e:
+                self.log_error(f"Python syntax error in {script_path}: {e.msg} (line {e.lineno})")
+                success = False
             except Exception as e:
                 self.log_error(f"Could not validate Python syntax for {script_path}: {str(e)}")
                 success = False
@@ -140,42 +306,47 @@ class ConfigValidator:
         """Validate lookup table files."""
         self.log_info("Validating lookup tables...")
         
-        required_lookups = {
-            "lookups/model_baselines.csv": ["model_id", "avg_response_time", "avg_confidence"],
-            "lookups/semantic_categories.csv": ["prompt_type", "category", "description"],
-            "lookups/alert_thresholds.csv": ["metric_name", "warning_threshold", "critical_threshold"]
-        }
-        
         success = True
-        for lookup_path, required_columns in required_lookups.items():
+        for lookup_path, required_columns in REQUIRED_LOOKUPS.items():
             full_path = self.app_home / lookup_path
             
-            if not full_path.exists():
+            entry = self._entry(lookup_path)
+            if entry is None:
                 self.log_error(f"Required lookup table missing: {full_path}")
                 success = False
                 continue
                 
             try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    headers = reader.fieldnames
+                with open(full_path, 'rb') as f:
+                    header_line = f.readline()
+                    headers = next(csv.reader([header_line.decode('utf-8')]), None)
                     
                     if not headers:
                         self.log_error(f"Lookup table has no headers: {lookup_path}")
                         success = False
                         continue
                         
-                    missing_columns = set(required_columns) - set(headers)
+                    missing_columns = required_columns.difference(headers)
                     if missing_columns:
-                        self.log_error(f"Missing columns in {lookup_path}: {missing_columns}")
+                        self.log_error(f"Missing columns in {lookup_path}: {set(missing_columns)}")
                         success = False
                     
-                    # Check for data
-                    row_count = sum(1 for _ in reader)
-                    if row_count == 0:
+                    # A file no longer than its header line has no data; otherwise
+                    # only look for a first row unless row counts were asked for
+                    # (blank lines are not rows, as with DictReader)
+                    first_row = None
+                    if entry.stat().st_size > len(header_line):
+                        rows = (row for row in csv.reader(io.TextIOWrapper(f, encoding='utf-8', newline=''))
+                                if row)
+                        first_row = next(rows, None)
+                    
+                    if first_row is None:
                         self.log_warning(f"Lookup table is empty: {lookup_path}")
-                    else:
+                    elif self.verbose:
+                        row_count = 1 + sum(1 for _ in rows)
                         self.log_info(f"Lookup table {lookup_path}: {row_count} rows")
+                    else:
+                        self.log_info(f"Lookup table {lookup_path}: has data")
                         
             except Exception as e:
                 self.log_error(f"Error reading lookup table {lookup_path}: {str(e)}")
@@ -187,34 +358,45 @@ class ConfigValidator:
         """Validate dashboard XML files."""
         self.log_info("Validating dashboards...")
         
-        required_dashboards = [
-            "default/data/ui/views/overview_dashboard.xml",
-            "default/data/ui/views/semantic_drift_analysis.xml", 
-            "default/data/ui/views/model_performance_tracking.xml",
-            "default/data/ui/views/anomaly_detection.xml",
-            "default/data/ui/views/alert_management.xml"
-        ]
-        
         success = True
-        for dashboard_path in required_dashboards:
+        schema = self._load_dashboard_schema()
+        if schema is not None:
+            # Never expand entities or fetch external resources from a dashboard
+            parser = lxml_etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=False)
+        
+        for dashboard_path in REQUIRED_DASHBOARDS:
             full_path = self.app_home / dashboard_path
             
-            if not full_path.exists():
+            if self._entry(dashboard_path) is None:
                 self.log_error(f"Required dashboard missing: {full_path}")
                 success = False
                 continue
+            
+            if schema is not None:
+                try:
+                    doc = lxml_etree.parse(str(full_path), parser)
+                    if not schema.validate(doc):
+                        self.log_warning(f"Dashboard might not be properly formatted: {dashboard_path}: "
+                                         f"{schema.error_log.last_error.message}")
+                except lxml_etree.XMLSyntaxError as e:
+                    self.log_error(f"Dashboard is not well-formed XML: {dashboard_path}: {str(e)}")
+                    success = False
+                except Exception as e:
+                    self.log_error(f"Error reading dashboard {dashboard_path}: {str(e)}")
+                    success = False
+                continue
                 
             try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                # Basic XML validation
-                if not content.strip().startswith('<'):
-                    self.log_error(f"Dashboard file doesn't appear to be XML: {dashboard_path}")
-                    success = False
-                elif '<form>' not in content and '<dashboard>' not in content:
+                # Basic XML validation: parse only as far as the root element
+                with open(full_path, 'rb') as f:
+                    _, root = next(ET.iterparse(f, events=('start',)))
+                
+                if root.tag not in DASHBOARD_ROOT_TAGS:
                     self.log_warning(f"Dashboard might not be properly formatted: {dashboard_path}")
                     
+            except (ET.ParseError, StopIteration):
+                self.log_error(f"Dashboard file doesn't appear to be XML: {dashboard_path}")
+                success = False
             except Exception as e:
                 self.log_error(f"Error reading dashboard {dashboard_path}: {str(e)}")
                 success = False
@@ -226,23 +408,22 @@ class ConfigValidator:
         self.log_info("Validating Python dependencies...")
         
         required_packages = ["numpy"]
-        optional_packages = ["pandas", "scipy", "scikit-learn"]
+        optional_packages = ["pandas", "scipy", "scikit-learn",
+                             "numba", "orjson", "pyarrow", "blake3", "lxml"]
         
         success = True
         
         for package in required_packages:
-            try:
-                __import__(package)
+            if _package_available(package):
                 self.log_info(f"Required package available: {package}")
-            except ImportError:
+            else:
                 self.log_error(f"Required Python package missing: {package}")
                 success = False
                 
         for package in optional_packages:
-            try:
-                __import__(package)
+            if _package_available(package):
                 self.log_info(f"Optional package available: {package}")
-            except ImportError:
+            else:
                 self.log_info(f"Optional package not available: {package}")
         
         return success
@@ -257,12 +438,16 @@ class ConfigValidator:
                 self.log_error(f"Splunk command not found: {splunk_cmd}")
                 return False
                 
-            # Check if Splunk is running
-            result = subprocess.run([
-                str(splunk_cmd), "status"
-            ], capture_output=True, text=True)
+            # Check if Splunk is running, from its PID file when there is one
+            running = self._splunkd_running_from_pid_file()
+            if running is None:
+                # Only an ASCII marker is looked for, so the output is not decoded
+                result = subprocess.run([
+                    str(splunk_cmd), "status"
+                ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                running = b"splunkd is running" in result.stdout
             
-            if "splunkd is running" in result.stdout:
+            if running:
                 self.log_info("Splunk is running")
                 return True
             else:
@@ -273,32 +458,83 @@ class ConfigValidator:
             self.log_error(f"Could not check Splunk status: {str(e)}")
             return False
     
+    def _load_dashboard_schema(self):
+        """Compile the dashboard schema once; None when lxml or the schema is unavailable."""
+        if not self._dashboard_schema_loaded:
+            self._dashboard_schema_loaded = True
+            if lxml_etree is not None and DASHBOARD_SCHEMA.is_file():
+                try:
+                    self._dashboard_schema = lxml_etree.XMLSchema(lxml_etree.parse(str(DASHBOARD_SCHEMA)))
+                except (lxml_etree.XMLSyntaxError, lxml_etree.XMLSchemaParseError) as e:
+                    self.log_warning(f"Could not load dashboard schema {DASHBOARD_SCHEMA}: {str(e)}")
+        
+        return self._dashboard_schema
+        
+    def _conf_stanzas(self, file_path: Path) -> Optional[set]:
+        """Return the "[name]" stanzas of a conf file, parsed once per file.
+        
+        Returns None when configparser cannot read the file (Splunk allows
+        syntax it rejects, such as backslash-continued values).
+        """
+        if file_path not in self._conf_stanzas_cache:
+            parser = configparser.ConfigParser(strict=False, interpolation=None)
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    parser.read_file(f)
+                stanzas = {f"[{section}]" for section in parser.sections()}
+            except configparser.Error:
+                stanzas = None
+            self._conf_stanzas_cache[file_path] = stanzas
+        
+        return self._conf_stanzas_cache[file_path]
+    
+    def _missing_stanzas(self, file_path: Path, required: Tuple[str, ...], pattern: re.Pattern) -> List[str]:
+        """Return the required stanzas (in order) that a conf file lacks."""
+        stanzas = self._conf_stanzas(file_path)
+        if stanzas is None:
+            # Fall back to finding the stanza headers as text
+            return _missing_literals(file_path.read_text(encoding='utf-8'), required, pattern)
+        return [stanza for stanza in required if stanza not in stanzas]
+    
+    def _splunkd_running_from_pid_file(self) -> Optional[bool]:
+        """Check splunkd's PID file; None if there is no usable PID file."""
+        pid_file = self.splunk_home / "var" / "run" / "splunk" / "splunkd.pid"
+        try:
+            pid = int(pid_file.read_text().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # The process exists but belongs to another user
+            pass
+        
+        # A stale PID file may name an unrelated process; check its name
+        # where /proc is available
+        try:
+            return Path("/proc", str(pid), "comm").read_text().startswith("splunkd")
+        except OSError:
+            return True
+    
     def _validate_app_conf(self, file_path: Path) -> bool:
         """Validate app.conf file."""
         # Basic validation - ensure it has required sections
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        required_sections = ["[install]", "[ui]", "[launcher]"]
-        for section in required_sections:
-            if section not in content:
-                self.log_error(f"Missing section {section} in app.conf")
-                return False
+        missing = self._missing_stanzas(file_path, REQUIRED_APP_SECTIONS, APP_SECTIONS_RE)
+        for section in missing:
+            self.log_error(f"Missing section {section} in app.conf")
         
-        return True
+        return not missing
     
     def _validate_commands_conf(self, file_path: Path) -> bool:
         """Validate commands.conf file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        required_commands = ["[driftdetect]", "[semanticcompare]", "[llmmetrics]"]
-        for command in required_commands:
-            if command not in content:
-                self.log_error(f"Missing command {command} in commands.conf")
-                return False
+        missing = self._missing_stanzas(file_path, REQUIRED_COMMANDS, COMMANDS_RE)
+        for command in missing:
+            self.log_error(f"Missing command {command} in commands.conf")
         
-        return True
+        return not missing
     
     def _validate_props_conf(self, file_path: Path) -> bool:
         """Validate props.conf file."""
@@ -330,27 +566,119 @@ class ConfigValidator:
             self._print_results()
             return False
         
-        all_checks = [
+        # List the app's directories once; every check reads from this
+        self._present = _scan_app_tree(self.app_home, ALL_REQUIRED_PATHS)
+        
+        # Checks of the app's files, whose results can be reused while none
+        # of the files change, then checks of the environment
+        file_checks = [
             self.validate_directory_structure,
             self.validate_configuration_files,
             self.validate_python_scripts,
             self.validate_lookup_tables,
-            self.validate_dashboards,
+            self.validate_dashboards
+        ]
+        environment_checks = [
             self.validate_dependencies,
             self.validate_splunk_connection
         ]
         
+        results = None
+        digest = None
+        if self.use_cache and not self.write_bytecode:
+            digest = self._manifest_digest()
+            results = self._load_cached_results(digest)
+        
+        if results is None:
+            results = self._run_checks(file_checks)
+            # Only a complete set of results can be reused
+            if digest is not None and len(results) == len(file_checks):
+                self._save_cached_results(digest, results)
+        
+        if self.fast_fail and not all(results):
+            self.log_info("Stopped at the first failed check (--fast-fail)")
+        else:
+            results += self._run_checks(environment_checks)
+        
+        self._print_results()
+        return all(results)
+    
+    def _run_checks(self, checks) -> List[bool]:
+        """Run checks in order, treating one that raises as failed.
+        
+        With fast_fail, stops after the first check that fails.
+        """
         results = []
-        for check in all_checks:
+        for check in checks:
             try:
                 result = check()
                 results.append(result)
             except Exception as e:
                 self.log_error(f"Validation check failed with exception: {str(e)}")
                 results.append(False)
+            
+            if self.fast_fail and not results[-1]:
+                break
         
-        self._print_results()
-        return all(results)
+        return results
+    
+    def _manifest_digest(self) -> str:
+        """Hash the required paths present in the app with their sizes, modification times and modes."""
+        h = hashlib.blake2b(digest_size=16)
+        
+        # Results also depend on the options (--fast-fail keeps only the checks
+        # up to the first failure), the Python compiling the scripts and this
+        # script itself
+        h.update(f"{self.app_home}|{self.verbose}|{self.fast_fail}|{sys.version}|"
+                 f"{lxml_etree is not None}|".encode())
+        h.update(struct.pack('<q', os.stat(__file__).st_mtime_ns))
+        if DASHBOARD_SCHEMA.is_file():
+            h.update(struct.pack('<q', DASHBOARD_SCHEMA.stat().st_mtime_ns))
+        
+        for rel_path in sorted(self._present):
+            st = self._present[rel_path].stat()
+            h.update(rel_path.encode())
+            h.update(struct.pack('<qqI', st.st_mtime_ns, st.st_size, st.st_mode))
+        
+        return h.hexdigest()
+    
+    def _load_cached_results(self, digest: str) -> Optional[List[bool]]:
+        """Restore the file check results and messages of an earlier run with the same digest."""
+        cache_path = _validation_cache_path()
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if (not isinstance(cached, dict) or cached.get('digest') != digest
+                or time.time() - cached.get('time', 0) > VALIDATION_CACHE_MAX_AGE):
+            return None
+        
+        self.errors.extend(cached['errors'])
+        self.warnings.extend(cached['warnings'])
+        self.info.extend(cached['info'])
+        self.log_info(f"App files unchanged; reused file check results from {cache_path} (use --force to re-run)")
+        return cached['results']
+    
+    def _save_cached_results(self, digest: str, results: List[bool]):
+        """Record the file check results and messages for later runs."""
+        cache_path = _validation_cache_path()
+        cached = {
+            'digest': digest,
+            'time': time.time(),
+            'results': results,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'info': self.info
+        }
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cached, f, ensure_ascii=False)
+        except OSError:
+            # Caching is best effort
+            pass
     
     def _print_results(self):
         """Print validation results."""
@@ -358,20 +686,18 @@ class ConfigValidator:
         print("📋 VALIDATION RESULTS")
         print("="*60)
         
+        # Each section's messages go out in a single write
         if self.errors:
             print("\n🔴 ERRORS:")
-            for error in self.errors:
-                print(f"  {error}")
+            sys.stdout.write(_indented_lines(self.errors))
         
         if self.warnings:
             print("\n🟡 WARNINGS:")
-            for warning in self.warnings:
-                print(f"  {warning}")
+            sys.stdout.write(_indented_lines(self.warnings))
         
         if self.info:
             print("\n🟢 INFO:")
-            for info in self.info:
-                print(f"  {info}")
+            sys.stdout.write(_indented_lines(self.info))
         
         print(f"\n📊 SUMMARY:")
         print(f"  Errors: {len(self.errors)}")
@@ -392,11 +718,18 @@ def main():
     parser.add_argument('--splunk-home', type=str, default='/opt/splunk',
                        help='Path to Splunk installation directory')
     parser.add_argument('--verbose', action='store_true',
-                       help='Enable verbose output')
+                       help='Enable verbose output (including lookup table row counts)')
+    parser.add_argument('--write-bytecode', action='store_true',
+                       help='Write .pyc files for the app scripts while checking their syntax')
+    parser.add_argument('--force', action='store_true',
+                       help='Re-run all file checks even if the app is unchanged since the last run')
+    parser.add_argument('--fast-fail', action='store_true',
+                       help='Stop at the first failing check instead of running them all')
     
     args = parser.parse_args()
     
-    validator = ConfigValidator(args.splunk_home)
+    validator = ConfigValidator(args.splunk_home, args.verbose, args.write_bytecode,
+                                use_cache=not args.force, fast_fail=args.fast_fail)
     success = validator.run_validation()
     
     if success: